@@ -1,191 +1,568 @@
-import json
-from datetime import datetime, timezone
+import asyncio
+import functools
+import importlib.util
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import orjson
 
 from config import config
-from helpers import get_recipe_system_prompt, get_yield_nutrition_prompt, setup_logger
+from helpers import (
+    format_iso_duration, get_recipe_system_prompt, get_yield_nutrition_prompt,
+    parse_iso_duration, setup_logger,
+)
+from llm_cache import NUTRITION_TTL, cached_llm_call
 
 logger = setup_logger(__name__)
 
+# Maximum number of recipes create_recipes_batch keeps in flight at once
+BATCH_CONCURRENCY = 5
+
+# Appended to the recipe system prompt when several videos share one request
+BATCH_PROMPT_SUFFIX = """
+Batch mode: the input is a JSON object {"items": [...]}, each item with "source_url", "description" and "transcript".
+Return a single JSON object {"results": [...]} with exactly one Recipe object per input item, in the same order.
+"""
+
+# Schema.org NutritionInformation fields accepted from the enrichment LLM
+_ALLOWED_NUTRITION = frozenset({
+    "@type", "calories", "proteinContent", "fatContent", "carbohydrateContent",
+    "fiberContent", "sugarContent", "sodiumContent", "cholesterolContent"
+})
+_NUTRITION_VALUE_KEYS = _ALLOWED_NUTRITION - {"@type"}
+
+_WS_RE = re.compile(r"\s+")
+# Characters that affect JSON nesting, scanned while a reply streams in
+_JSON_TOKEN_RE = re.compile(r'[{}\[\]"\\]')
+# Plain decimal quantity, with either "." or "," as the separator
+_NUM_RE = re.compile(r"-?\d+(?:[.,]\d+)?")
+# Closed markdown code block anywhere in the text
+_CODEBLOCK_RE = re.compile(r"```[\w+-]*\s*(.*?)```", re.DOTALL)
+# Markdown code block (```json ... ``` or ``` ... ```); the closing fence may be missing
+_FENCE_RE = re.compile(r"^\s*```[\w+-]*\s*(.*?)\s*(?:```)?\s*$", re.DOTALL)
+# Outermost {...} span, used to drop prose the model wrapped around its JSON
+_SALVAGE_RE = re.compile(r"\{.*\}", re.DOTALL)
+
 
 def _extract_json(text: str) -> str:
     """Extract JSON from text, stripping markdown code blocks if present."""
-    if not text:
-        return text
-    text = text.strip()
-    # Remove markdown code blocks (```json ... ``` or ``` ... ```)
-    if text.startswith("```"):
-        # Find the end of the first line (language specifier)
-        first_newline = text.find("\n")
-        if first_newline != -1:
-            text = text[first_newline + 1:]
-        # Remove trailing ```
-        if text.endswith("```"):
-            text = text[:-3]
-        text = text.strip()
-    return text
+    if not text or "```" not in text:
+        return text.strip() if text else text
+    # Prefer the first fenced block that holds JSON, ignoring any prose or
+    # other code blocks around it
+    for block in _CODEBLOCK_RE.findall(text):
+        block = block.strip()
+        if block.startswith(("{", "[")):
+            return block
+    # A single (possibly unterminated) fence around the whole reply
+    m = _FENCE_RE.match(text)
+    return (m.group(1) if m else text).strip()
+
+
+def _loads_lenient(text: str):
+    """Parse an LLM reply as JSON, repairing common defects locally.
+
+    Tries a strict parse, then the contents of a markdown code fence, then
+    the outermost {...} span of the reply, then json-repair if it is
+    installed. Raises orjson.JSONDecodeError if none of these yield an object.
+    """
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError as e:
+        error = e
+
+    if "```" in text:
+        try:
+            return orjson.loads(_extract_json(text))
+        except orjson.JSONDecodeError:
+            pass
+
+    m = _SALVAGE_RE.search(text)
+    if m:
+        try:
+            data = orjson.loads(m.group(0))
+            logger.info("[AI Recipe] Salvaged JSON object from surrounding text")
+            return data
+        except orjson.JSONDecodeError:
+            pass
+
+    try:
+        from json_repair import repair_json
+    except ImportError:
+        raise error
+    data = repair_json(text, return_objects=True)
+    if not isinstance(data, dict) or not data:
+        raise error
+    logger.info("[AI Recipe] Repaired malformed JSON with json-repair")
+    return data
+
+
+@functools.lru_cache(maxsize=4096)
+def _collapse_space(text: str) -> str:
+    return _WS_RE.sub(" ", text).strip()
+
+
+def _normalize_space(value) -> str:
+    """Collapse runs of whitespace into single spaces and strip the ends.
+
+    Results are cached, since ingredient tokens like "olive oil" or "tsp"
+    repeat heavily across recipes.
+    """
+    return _collapse_space("" if value is None else str(value))
+
+
+# Async LLM clients shared by all Chefs, keyed by (provider, API key, event loop).
+# A client's connection pool is bound to the loop it runs on, so it is only
+# reused on that loop.
+_clients: dict[tuple, object] = {}
+_clients_lock = threading.Lock()
+
+# Connection pool size per client. With HTTP/2 (when the h2 package is
+# installed) concurrent requests are multiplexed over a single connection.
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE = 32
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+# Attempts per LLM request on transient errors, and the backoff ceiling (seconds)
+LLM_MAX_ATTEMPTS = 4
+LLM_BACKOFF_CAP = 60
+
+# Event loop that runs the coroutines of synchronous callers, so that they
+# all share the same clients and keep-alive connections
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def _get_client(provider: str, api_key: str):
+    """Return the shared async client for provider on the running event loop."""
+    key = (provider, api_key, asyncio.get_running_loop())
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            # Drop clients whose event loop has finished (e.g. after asyncio.run)
+            for stale in [k for k in _clients if k[2].is_closed()]:
+                del _clients[stale]
+            import httpx
+            limits = httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            )
+            if provider == "openai":
+                from openai import AsyncOpenAI
+                client = AsyncOpenAI(
+                    api_key=api_key,
+                    http_client=httpx.AsyncClient(http2=_HTTP2, limits=limits),
+                )
+            elif provider == "gemini":
+                from google import genai
+                from google.genai import types
+                client = genai.Client(
+                    api_key=api_key,
+                    http_options=types.HttpOptions(
+                        async_client_args={"http2": _HTTP2, "limits": limits}
+                    ),
+                )
+            else:
+                raise ValueError(f"Unknown LLM provider: {provider}")
+            _clients[key] = client
+        return client
+
+
+def _run_sync(coro):
+    """Run a coroutine on the shared Chef event loop and wait for its result."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="chef-event-loop", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
+class _JsonStreamScanner:
+    """Track where the first top-level JSON object or array in a stream ends.
+
+    Only structural characters are inspected, and string contents (including
+    escaped quotes) are skipped, so braces inside values do not count.
+    """
+
+    __slots__ = ("start", "end", "_offset", "_depth", "_in_string", "_skip")
+
+    def __init__(self):
+        self.start = -1
+        self.end = -1
+        self._offset = 0
+        self._depth = 0
+        self._in_string = False
+        self._skip = -1
+
+    @property
+    def done(self) -> bool:
+        return self.end >= 0
+
+    def feed(self, chunk: str) -> bool:
+        """Scan the next chunk of text; return True once the value is complete."""
+        if self.done:
+            return True
+        base = self._offset
+        self._offset += len(chunk)
+        for m in _JSON_TOKEN_RE.finditer(chunk):
+            pos = base + m.start()
+            ch = m.group()
+            if pos == self._skip:
+                continue
+            if self._in_string:
+                if ch == "\\":
+                    self._skip = pos + 1
+                elif ch == '"':
+                    self._in_string = False
+            elif self.start < 0:
+                if ch in "{[":
+                    self.start, self._depth = pos, 1
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.end = pos + 1
+                    return True
+        return False
+
+    def extract(self, text: str) -> str:
+        """Return the complete JSON value from text, or text if none was seen."""
+        return text[self.start:self.end] if self.done else text
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether an LLM client error is worth retrying (rate limit, timeout, 5xx)."""
+    try:
+        import openai
+    except ImportError:
+        pass
+    else:
+        if isinstance(error, (openai.RateLimitError, openai.APIConnectionError,
+                              openai.InternalServerError)):
+            return True
+    try:
+        from google.genai import errors
+    except ImportError:
+        pass
+    else:
+        if isinstance(error, errors.APIError):
+            code = error.code or 0
+            return code == 429 or code >= 500
+    try:
+        import httpx
+    except ImportError:
+        return False
+    return isinstance(error, httpx.TransportError)
+
+
+@dataclass(slots=True)
+class Ingredient:
+    """A cleaned ingredient row while a recipe is being postprocessed."""
+    food: str
+    quantity: str
+    unit: str
+    notes: str
+    raw: str
+
+    def as_dict(self) -> dict:
+        return {"food": self.food, "quantity": self.quantity, "unit": self.unit,
+                "notes": self.notes, "raw": self.raw}
+
+
+def _merge_note(ingredient: Ingredient, seen_notes: set[str], note: str):
+    """Append note to an ingredient's notes unless it was already merged in."""
+    if not note or note in seen_notes:
+        return
+    seen_notes.add(note)
+    ingredient.notes = f"{ingredient.notes}, {note}" if ingredient.notes else note
+
+
+def _clean_ingredient(i) -> tuple[str, str, str, str, str] | None:
+    """Normalize one LLM ingredient to (food, quantity, unit, notes, raw).
+
+    Returns None for entries that are not dicts or have no food name.
+    """
+    if not isinstance(i, dict):
+        return None
+    food = _normalize_space(i.get("food"))
+    if not food:
+        return None
+    return (
+        food,
+        _normalize_space(i.get("quantity")),
+        _normalize_space(i.get("unit")),
+        _normalize_space(i.get("notes")),
+        (i.get("raw") or "").strip(),
+    )
+
+
+def _try_float(quantity: str) -> float | None:
+    """Parse a quantity like "2", "1.5" or "1,5" as a number, or return None."""
+    # Matching first skips raising ValueError for "a pinch", "to taste", ...
+    if not quantity or not _NUM_RE.fullmatch(quantity):
+        return None
+    return float(quantity.replace(",", "."))
+
+
+def _flatten_ingredients(ingredients: list) -> tuple[list[dict], list[str]]:
+    """Clean and deduplicate LLM ingredients.
+
+    Returns the structured ``recipeIngredients`` and the flattened Schema.org
+    ``recipeIngredient`` strings. Kept free of Chef state so stored recipes can
+    be reprocessed in bulk without an LLM client.
+    """
+    clean: list[Ingredient] = []
+    # Map (casefolded food, unit) to the index of its entry in clean, the notes
+    # merged into it and its numeric quantity (None if not a number)
+    merged: dict[tuple[str, str], tuple[int, set[str], float | None]] = {}
+
+    for i in ingredients:
+        cleaned = _clean_ingredient(i)
+        if cleaned is None:
+            continue
+        food, qty, unit, notes, raw_from_llm = cleaned
+        key = (food.casefold(), unit)
+        num = _try_float(qty)
+
+        entry = merged.get(key)
+        if entry is not None:
+            idx, seen_notes, existing_num = entry
+            existing = clean[idx]
+            # Same amount repeated: only the notes can add anything
+            if existing.quantity == qty:
+                _merge_note(existing, seen_notes, notes)
+                continue
+            # Both amounts numeric in the same unit: sum them up
+            if existing_num is not None and num is not None:
+                total = existing_num + num
+                existing.quantity = str(int(total) if total == int(total) else total)
+                merged[key] = (idx, seen_notes, total)
+                _merge_note(existing, seen_notes, notes)
+                continue
+            # Missing or non-numeric amounts are kept as separate entries
+        else:
+            merged[key] = (len(clean), {notes} if notes else set(), num)
+
+        # Generate raw line for display (use LLM-provided raw if available)
+        raw_line = raw_from_llm or " ".join(p for p in [qty, unit, food, notes] if p).strip()
+        clean.append(Ingredient(food, qty, unit, notes, raw_line))
+
+    # Merges can still change earlier entries, so the output is built in one
+    # pass once the list is final: structured dicts plus the Schema.org
+    # recipeIngredient (flattened strings) for compatibility
+    structured = []
+    flattened = []
+    for i in clean:
+        structured.append(i.as_dict())
+        flattened.append(" ".join(filter(None, (i.quantity, i.unit, i.food, i.notes))).replace("–", "-"))
+    return structured, flattened
 
 
 class Chef:
+    __slots__ = ("provider", "api_key", "model", "source_url", "description", "transcription",
+                 "_default_video", "_recipe_prompt", "_yield_prompt", "_stream")
+
     def __init__(self, source_url: str, description: str, transcription: str, *, model: str | None = None):
         logger.info("[AI Recipe] Initializing Chef...")
         self.provider = config.LLM_PROVIDER
         
         if self.provider == "openai":
-            from openai import OpenAI
             logger.info("[AI Recipe] Using OpenAI LLM provider")
-            self.client = OpenAI(api_key=config.OPENAI_API_KEY)
+            self.api_key = config.OPENAI_API_KEY
             self.model = model or config.OPENAI_MODEL
+            self._stream = self._stream_openai
             logger.info(f"[AI Recipe] OpenAI model: {self.model}")
         elif self.provider == "gemini":
-            from google import genai
             logger.info("[AI Recipe] Using Gemini LLM provider")
-            self.client = genai.Client(api_key=config.GEMINI_API_KEY)
+            self.api_key = config.GEMINI_API_KEY
             self.model = model or config.GEMINI_MODEL
+            self._stream = self._stream_gemini
             logger.info(f"[AI Recipe] Gemini model: {self.model}")
         else:
             raise ValueError(f"Unknown LLM provider: {self.provider}")
         self.source_url = source_url
+        self._default_video = MappingProxyType({"@type": "VideoObject", "url": source_url})
         self.description = description
         self.transcription = transcription
+        # Prompts depend only on the configured language; build them once
+        self._recipe_prompt = get_recipe_system_prompt()
+        self._yield_prompt = get_yield_nutrition_prompt()
         logger.info(f"[AI Recipe] Chef initialized. Transcription length: {len(transcription)} chars")
 
-    def _call_llm(self, system_prompt: str, user_content: str) -> str:
-        """Call the LLM and return the response text, abstracting provider differences."""
-        if self.provider == "openai":
-            resp = self.client.responses.create(
-                model=self.model,
-                input=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_content},
-                ],
-            )
-            return resp.output_text
-        elif self.provider == "gemini":
-            resp = self.client.models.generate_content(
-                model=self.model,
-                contents=f"{system_prompt}\n\n{user_content}"
-            )
-            raw_text = resp.text or ""
-            logger.debug(f"Gemini raw response: {raw_text[:500]}...")
-            # Extract JSON from markdown code blocks if present
-            return _extract_json(raw_text)
-        else:
-            raise ValueError(f"Unknown LLM provider: {self.provider}")
+    @property
+    def client(self):
+        """The shared async client for this Chef's provider on the running event loop."""
+        return _get_client(self.provider, self.api_key)
+
+    @classmethod
+    async def aclose(cls):
+        """Close the shared LLM clients and their HTTP connection pools.
+
+        Clients created on other event loops cannot be closed from here and
+        are just dropped.
+        """
+        loop = asyncio.get_running_loop()
+        with _clients_lock:
+            clients = list(_clients.items())
+            _clients.clear()
+        for (provider, _, client_loop), client in clients:
+            if client_loop is not loop:
+                continue
+            if provider == "openai":
+                await client.close()
+            elif hasattr(client.aio, "aclose"):
+                await client.aio.aclose()
+
+    @cached_llm_call
+    async def _call_llm_async(self, system_prompt: str, user_content: str) -> str:
+        """Call the LLM and return the response text, abstracting provider differences.
+
+        Rate limits, timeouts and server errors are retried with exponential
+        backoff and jitter, up to LLM_MAX_ATTEMPTS attempts.
+        """
+        for attempt in range(LLM_MAX_ATTEMPTS):
+            try:
+                return await self._stream(system_prompt, user_content)
+            except Exception as e:
+                if attempt == LLM_MAX_ATTEMPTS - 1 or not _is_transient(e):
+                    raise
+                delay = min(LLM_BACKOFF_CAP, 2 ** attempt + random.random())
+                logger.warning(f"[AI Recipe] LLM call failed ({type(e).__name__}: {e}), "
+                               f"retrying in {delay:.1f}s ({attempt + 1}/{LLM_MAX_ATTEMPTS})...")
+                await asyncio.sleep(delay)
+
+    async def _stream_openai(self, system_prompt: str, user_content: str) -> str:
+        """Send one OpenAI request and collect the streamed response text."""
+        # Stream the reply so the body is received while the model is still
+        # generating, and stop reading as soon as the JSON value is complete
+        # so trailing prose or a closing fence is not waited for
+        chunks: list[str] = []
+        scanner = _JsonStreamScanner()
+        async with self.client.responses.stream(
+            model=self.model,
+            input=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content},
+            ],
+            text={"format": {"type": "json_object"}},  # Bare JSON, no fences
+        ) as stream:
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    chunks.append(event.delta)
+                    if scanner.feed(event.delta):
+                        break
+        return scanner.extract("".join(chunks))
+
+    async def _stream_gemini(self, system_prompt: str, user_content: str) -> str:
+        """Send one Gemini request and collect the streamed response text."""
+        chunks: list[str] = []
+        scanner = _JsonStreamScanner()
+        async for chunk in await self.client.aio.models.generate_content_stream(
+            model=self.model,
+            contents=f"{system_prompt}\n\n{user_content}",
+            config={"response_mime_type": "application/json"},
+        ):
+            if chunk.text:
+                chunks.append(chunk.text)
+                if scanner.feed(chunk.text):
+                    break
+        raw_text = "".join(chunks)
+        logger.debug("Gemini raw response: %s...", raw_text[:500])
+        if scanner.done:
+            return scanner.extract(raw_text)
+        # Extract JSON from markdown code blocks if present
+        return _extract_json(raw_text)
 
     def _postprocess_recipe(self, data: dict, source_url: str | None) -> dict:
-        data.setdefault("@context", "https://schema.org")
-        data.setdefault("@type", "Recipe")
-        data.setdefault("url", source_url or self.source_url)
-        data.setdefault("video", {"@type": "VideoObject", "url": source_url or self.source_url})
+        url = source_url or self.source_url
+        # Values from the LLM win over these defaults
+        data = {
+            "@context": "https://schema.org",
+            "@type": "Recipe",
+            "url": url,
+            **data,
+        }
+        if "video" not in data:
+            if url == self.source_url:
+                data["video"] = dict(self._default_video)
+            else:
+                data["video"] = {"@type": "VideoObject", "url": url}
 
         # Ensure valid date
         dp = data.get("datePublished")
         if not isinstance(dp, str) or len(dp) <= 10:
-            data["datePublished"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            data["datePublished"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
         # --- Clean and deduplicate recipeIngredients ---
-        ingredients = data.get("recipeIngredients") or []
-        clean = []
-        seen_foods: dict[str, int] = {}  # Map food name (casefolded) to index in clean list
-        
-        for i in ingredients:
-            if not isinstance(i, dict):
-                continue
-            food = " ".join(str(i.get("food", "")).split()).strip()
-            qty = " ".join(str(i.get("quantity", "")).split()).strip()
-            unit = " ".join(str(i.get("unit", "")).split()).strip()
-            notes = " ".join(str(i.get("notes", "")).split()).strip()
-            raw_from_llm = (i.get("raw") or "").strip()
-            if not food:
-                continue
-            
-            food_key = food.casefold()
-            # Generate raw line for display (use LLM-provided raw if available)
-            raw_line = raw_from_llm or " ".join(p for p in [qty, unit, food, notes] if p).strip()
-            
-            if food_key in seen_foods:
-                # Merge duplicate: combine quantities or notes
-                existing_idx = seen_foods[food_key]
-                existing = clean[existing_idx]
-                
-                # If same quantity and unit, just merge notes
-                if existing["quantity"] == qty and existing["unit"] == unit:
-                    if notes and notes not in existing["notes"]:
-                        if existing["notes"]:
-                            existing["notes"] = f"{existing['notes']}, {notes}"
-                        else:
-                            existing["notes"] = notes
-                # If different quantities, combine them (e.g., "1 + 1" or just add second amount)
-                elif qty and existing["quantity"]:
-                    # Try to add numeric quantities
-                    try:
-                        existing_num = float(existing["quantity"].replace(",", "."))
-                        new_num = float(qty.replace(",", "."))
-                        if existing["unit"] == unit:
-                            # Same unit, sum them up
-                            total = existing_num + new_num
-                            existing["quantity"] = str(int(total) if total == int(total) else total)
-                            if notes and notes not in existing["notes"]:
-                                if existing["notes"]:
-                                    existing["notes"] = f"{existing['notes']}, {notes}"
-                                else:
-                                    existing["notes"] = notes
-                        else:
-                            # Different units, keep both as separate entries
-                            clean.append({"food": food, "quantity": qty, "unit": unit, "notes": notes, "raw": raw_line})
-                    except ValueError:
-                        # Non-numeric quantities, keep as separate entries
-                        clean.append({"food": food, "quantity": qty, "unit": unit, "notes": notes, "raw": raw_line})
-                else:
-                    # One or both have no quantity, keep both
-                    clean.append({"food": food, "quantity": qty, "unit": unit, "notes": notes, "raw": raw_line})
-            else:
-                seen_foods[food_key] = len(clean)
-                clean.append({"food": food, "quantity": qty, "unit": unit, "notes": notes, "raw": raw_line})
-
-        # Store structured ingredients
-        data["recipeIngredients"] = clean
-        logger.info(f"[Chef] Processed {len(clean)} ingredients")
-
-        # Create Schema.org recipeIngredient (flattened strings) for compatibility
-        flattened = []
-        for i in clean:
-            parts = [i["quantity"], i["unit"], i["food"], i.get("notes", "")]
-            line = " ".join(p for p in parts if p).strip().replace("–", "-")
-            if line:
-                flattened.append(line)
+        structured, flattened = _flatten_ingredients(data.get("recipeIngredients") or [])
+        data["recipeIngredients"] = structured
+        logger.info(f"[Chef] Processed {len(structured)} ingredients")
         data["recipeIngredient"] = flattened
 
         return data
 
-    def create_recipe(self, *, source_url: str | None = None, max_retries: int = 3) -> dict:
-        logger.info("[AI Recipe] Starting recipe creation from transcription...")
-        payload = {
+    def _recipe_payload(self, source_url: str | None) -> dict:
+        """Build the user content for the recipe generation prompt."""
+        return {
             "source_url": source_url,
             "description": self.description,
             "transcript": self.transcription,
         }
 
+    def create_recipe(self, *, source_url: str | None = None, max_retries: int = 3) -> dict:
+        """Blocking wrapper around acreate_recipe for synchronous callers."""
+        return _run_sync(self.acreate_recipe(source_url=source_url, max_retries=max_retries))
+
+    async def acreate_recipe(self, *, source_url: str | None = None, max_retries: int = 3,
+                             speculative_estimate: bool = False) -> dict:
+        """Generate a recipe from the video text.
+
+        The recipe prompt already asks for times and nutrition, so the separate
+        yield/nutrition estimate is normally only requested afterwards, for
+        fields the recipe left out. With ``speculative_estimate`` it is instead
+        started alongside the recipe from the video text, which saves a round
+        trip when fields are expected to be missing, at the cost of a second
+        request carrying the full transcript on every call.
+        """
+        logger.info("[AI Recipe] Starting recipe creation from transcription...")
+        payload = self._recipe_payload(source_url)
+        if not speculative_estimate:
+            return await self._generate_recipe(payload, source_url, max_retries)
+        speculative = asyncio.create_task(self._speculative_estimate())
+        try:
+            return await self._generate_recipe(payload, source_url, max_retries, speculative)
+        finally:
+            speculative.cancel()
+
+    async def _generate_recipe(self, payload: dict, source_url: str | None, max_retries: int,
+                               speculative: asyncio.Task | None = None) -> dict:
+        # Serialize the (possibly long) transcript once for all attempts
+        user_content = orjson.dumps(payload).decode()
         last_error = None
         for attempt in range(max_retries):
             try:
                 logger.info(f"[AI Recipe] Calling LLM to generate recipe (attempt {attempt + 1}/{max_retries})...")
-                response_text = self._call_llm(
-                    get_recipe_system_prompt(),
-                    json.dumps(payload, ensure_ascii=False)
-                )
+                response_text = await self._call_llm_async(self._recipe_prompt, user_content)
                 logger.info(f"[AI Recipe] LLM response received ({len(response_text)} chars)")
-                data = json.loads(response_text)
+                data = _loads_lenient(response_text)
                 logger.info(f"[AI Recipe] Recipe parsed. Name: {data.get('name', 'Unknown')}")
                 recipe = self._postprocess_recipe(data, source_url)
                 logger.info(f"[AI Recipe] Recipe postprocessed. Ingredients: {len(recipe.get('recipeIngredient', []))}, Steps: {len(recipe.get('recipeInstructions', []))}")
-                recipe = self._enrich_yield_and_nutrition(recipe)
+                recipe = await self._enrich_yield_and_nutrition(recipe, speculative)
                 logger.info("[AI Recipe] Recipe creation complete.")
                 return recipe
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
                 last_error = e
                 logger.warning(f"[AI Recipe] JSON parsing failed (attempt {attempt + 1}/{max_retries}): {e}")
-                logger.debug(f"[AI Recipe] Raw response: {response_text[:500]}...")
+                logger.debug("[AI Recipe] Raw response: %s...", response_text[:500])
                 if attempt < max_retries - 1:
                     continue
         
@@ -194,7 +571,69 @@ class Chef:
             f"Last error: {last_error}"
         )
 
-    def _enrich_yield_and_nutrition(self, recipe: dict) -> dict:
+    def _derive_missing_fields(self, recipe: dict):
+        """Fill yield and time fields that can be computed from the recipe itself.
+
+        Any one of prepTime, cookTime and totalTime follows from the other two,
+        and a numeric "servings" field gives the yield, so these cases don't
+        need an enrichment LLM call.
+        """
+        if "recipeYield" not in recipe:
+            servings = recipe.get("servings")
+            if isinstance(servings, str) and servings.strip().isdigit():
+                servings = int(servings)
+            if isinstance(servings, int) and servings > 0:
+                recipe["recipeYield"] = f"{servings} servings"
+                logger.info(f"[Chef] Derived recipeYield from servings: {servings}")
+
+        times = {k: parse_iso_duration(recipe[k]) for k in ("prepTime", "cookTime", "totalTime") if k in recipe}
+        if len(times) != 2 or not all(times.values()):
+            return
+        if "totalTime" not in times:
+            minutes = times["prepTime"] + times["cookTime"]
+            missing = "totalTime"
+        elif "cookTime" not in times:
+            minutes = times["totalTime"] - times["prepTime"]
+            missing = "cookTime"
+        else:
+            minutes = times["totalTime"] - times["cookTime"]
+            missing = "prepTime"
+        if minutes > 0:
+            recipe[missing] = format_iso_duration(minutes)
+            logger.info(f"[Chef] Derived {missing}: {recipe[missing]}")
+
+    async def _estimate_yield_and_nutrition(self, payload: dict) -> dict:
+        """Ask the LLM for servings, times and nutrition for the given input."""
+        response_text = await self._call_llm_async(
+            self._yield_prompt,
+            orjson.dumps(payload, option=orjson.OPT_SORT_KEYS).decode(),
+            cache_ttl=NUTRITION_TTL
+        )
+        try:
+            return _loads_lenient(response_text)
+        except orjson.JSONDecodeError as e:
+            raise RuntimeError(
+                f"Nutrition/servings/time estimation failed: {e}\nRaw:\n{response_text}")
+
+    async def _speculative_estimate(self) -> dict | None:
+        """Estimate yield and nutrition from the description and transcript.
+
+        Runs concurrently with recipe generation. Returns None on failure so
+        that enrichment falls back to the structured recipe.
+        """
+        payload = {
+            "language_hint": config.RECIPE_LANG,
+            "description": self.description,
+            "transcript": self.transcription,
+        }
+        try:
+            return await self._estimate_yield_and_nutrition(payload)
+        except Exception as e:
+            logger.warning(f"[Chef] Speculative yield/nutrition estimate failed: {e}")
+            return None
+
+    async def _enrich_yield_and_nutrition(self, recipe: dict, speculative: asyncio.Task | None = None) -> dict:
+        self._derive_missing_fields(recipe)
         need_yield = "recipeYield" not in recipe
         need_nutrition = "nutrition" not in recipe
         need_prep_time = "prepTime" not in recipe
@@ -204,25 +643,23 @@ class Chef:
         if not (need_yield or need_nutrition or need_prep_time or need_cook_time or need_total_time):
             return recipe  # Nothing to enrich
 
-        # Prepare input for the LLM: ingredients list + instructions
-        payload = {
-            "language_hint": config.RECIPE_LANG,
-            "ingredients": recipe.get("recipeIngredient", []),
-            "instructions": [
-                (step.get("text") if isinstance(step, dict) else str(step))
-                for step in (recipe.get("recipeInstructions") or [])
-            ]
-        }
-
-        response_text = self._call_llm(
-            get_yield_nutrition_prompt(),
-            json.dumps(payload, ensure_ascii=False)
-        )
-        try:
-            est = json.loads(response_text)
-        except json.JSONDecodeError as e:
-            raise RuntimeError(
-                f"Nutrition/servings/time estimation failed: {e}\nRaw:\n{response_text}")
+        est = await speculative if speculative is not None else None
+        if est is not None:
+            logger.info("[Chef] Using speculative yield/nutrition estimate")
+        else:
+            # Prepare input for the LLM: ingredients list + instructions.
+            # The payload only depends on the recipe content (not the source URL)
+            # and is serialized canonically, so recurring recipes hit the response
+            # cache even when the ingredients come back in a different order.
+            payload = {
+                "language_hint": config.RECIPE_LANG,
+                "ingredients": sorted(recipe.get("recipeIngredient", [])),
+                "instructions": [
+                    (step.get("text") if isinstance(step, dict) else str(step))
+                    for step in (recipe.get("recipeInstructions") or [])
+                ]
+            }
+            est = await self._estimate_yield_and_nutrition(payload)
 
         # Apply yield if needed
         if need_yield:
@@ -249,18 +686,12 @@ class Chef:
         # Apply nutrition if needed
         logger.info(f"[Chef] need_nutrition={need_nutrition}, est nutrition={est.get('nutrition')}")
         if need_nutrition and isinstance(est.get("nutrition"), dict):
-            allowed = {
-                "@type", "calories", "proteinContent", "fatContent", "carbohydrateContent",
-                "fiberContent", "sugarContent", "sodiumContent", "cholesterolContent"
+            nutrition = {
+                "@type": "NutritionInformation",
+                **{k: str(v) for k, v in est["nutrition"].items() if k in _ALLOWED_NUTRITION and v},
             }
-            nutrition = {"@type": "NutritionInformation"}
-            for k, v in est["nutrition"].items():
-                if k in allowed and v:
-                    nutrition[k] = str(v)
             # Add nutrition if we have at least one valid field
-            if any(k in nutrition for k in ("calories", "proteinContent", "fatContent",
-                                            "carbohydrateContent", "fiberContent",
-                                            "sugarContent", "sodiumContent", "cholesterolContent")):
+            if not _NUTRITION_VALUE_KEYS.isdisjoint(nutrition):
                 recipe["nutrition"] = nutrition
                 logger.info(f"[Chef] Added nutrition to recipe: {nutrition}")
             else:
@@ -269,3 +700,69 @@ class Chef:
             logger.warning(f"[Chef] Skipping nutrition: need_nutrition={need_nutrition}")
 
         return recipe
+
+
+async def _create_recipes_fused(chefs: list[Chef]) -> list[dict]:
+    """Generate recipes for several Chefs with a single LLM request.
+
+    The shared system prompt is sent once for the whole group. If the reply
+    has no ``results`` list with one entry per input, each Chef falls back to
+    its own request; so does any Chef whose entry is not a recipe object.
+    """
+    lead = chefs[0]
+    payload = {"items": [chef._recipe_payload(None) for chef in chefs]}
+    logger.info(f"[AI Recipe] Calling LLM to generate {len(chefs)} recipes in one request...")
+    response_text = await lead._call_llm_async(
+        lead._recipe_prompt + BATCH_PROMPT_SUFFIX,
+        orjson.dumps(payload).decode()
+    )
+    try:
+        data = _loads_lenient(response_text)
+    except orjson.JSONDecodeError:
+        data = None
+    items = data.get("results") if isinstance(data, dict) else data
+    if not isinstance(items, list) or len(items) != len(chefs):
+        logger.warning("[AI Recipe] Batched response unusable, creating recipes one by one")
+        return [await chef.acreate_recipe() for chef in chefs]
+
+    async def _finish(chef: Chef, item) -> dict:
+        if not isinstance(item, dict):
+            logger.warning("[AI Recipe] Batched recipe missing, creating it separately")
+            return await chef.acreate_recipe()
+        return await chef._enrich_yield_and_nutrition(chef._postprocess_recipe(item, None))
+
+    return list(await asyncio.gather(*(_finish(chef, item) for chef, item in zip(chefs, items))))
+
+
+async def create_recipes_batch(chefs: list[Chef], *, max_concurrency: int = BATCH_CONCURRENCY,
+                               batch_size: int = 1) -> list[dict]:
+    """Create recipes for several videos concurrently.
+
+    Up to ``max_concurrency`` requests are in flight at once, so the LLM round
+    trips of different recipes overlap. With ``batch_size`` > 1, groups of that
+    many videos are also packed into a single recipe request, which saves the
+    repeated system prompt tokens and per-request overhead.
+
+    Args:
+        chefs: Chef instances, one per video.
+        max_concurrency: Maximum number of requests being processed at once.
+        batch_size: Number of videos sent per recipe request; values below 1
+            are treated as 1.
+
+    Returns:
+        Recipes in the same order as ``chefs``.
+    """
+    batch_size = max(1, batch_size)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _create(group: list[Chef]) -> list[dict]:
+        async with semaphore:
+            if len(group) == 1:
+                return [await group[0].acreate_recipe()]
+            return await _create_recipes_fused(group)
+
+    groups = [chefs[i:i + batch_size] for i in range(0, len(chefs), batch_size)]
+    logger.info(f"[AI Recipe] Creating {len(chefs)} recipes in {len(groups)} requests "
+                f"(max {max_concurrency} concurrent)...")
+    results = await asyncio.gather(*(_create(group) for group in groups))
+    return [recipe for group in results for recipe in group]
@@ -3,11 +3,15 @@ Configuration module for Social Recipes.
 Reads configuration from SQLite database with defaults for first run.
 """
 
+import functools
 import os
 import sqlite3
-from contextlib import contextmanager
+import threading
+from collections import ChainMap
+from collections.abc import Mapping
+from types import MappingProxyType
 
-# Database file path - must match ui/database.py location
+# Database file path - shared with ui/database.py
 DATA_DIR = os.environ.get('DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
 os.makedirs(DATA_DIR, exist_ok=True)
 DB_FILE = os.path.join(DATA_DIR, 'social_recipes.db')
@@ -19,6 +23,7 @@ DEFAULT_CONFIG = {
     "openai_model": "gpt-5-mini-2025-08-07",
     "gemini_api_key": "",
     "gemini_model": "gemini-2.0-flash",
+    "llm_semantic_cache": "false",
     "recipe_lang": "hebrew",
     "mealie_api_key": "",
     "mealie_host": "",
@@ -34,131 +39,146 @@ DEFAULT_CONFIG = {
     "yt_dlp_cookies_browser": ""
 }
 
+# Read-only view of the defaults that loaded settings are layered over
+_DEFAULTS = MappingProxyType(DEFAULT_CONFIG)
 
-@contextmanager
-def get_db():
-    """Context manager for database connections."""
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
-    try:
-        yield conn
-    finally:
-        conn.close()
-
-
-def _get_config_from_db() -> dict:
-    """Load all configuration values from SQLite database."""
-    config = DEFAULT_CONFIG.copy()
-
-    # Only try to read from DB if it exists
-    if not os.path.exists(DB_FILE):
-        return config
-
-    try:
-        with get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT key, value FROM config')
-            for row in cursor.fetchall():
-                config[row['key']] = row['value']
-    except sqlite3.OperationalError:
-        # Table doesn't exist yet, use defaults
-        pass
 
-    return config
+# Read-only connection shared by all config reads, opened on first use
+_conn: sqlite3.Connection | None = None
+_conn_lock = threading.Lock()
 
 
-class Config:
-    """Configuration class that reads from SQLite database.
+def _get_connection() -> sqlite3.Connection:
+    """Return the shared read-only database connection; call with _conn_lock held.
 
-    Uses default values if database is not available or value is not set.
+    The UI owns writes to the database; opening it read-only in autocommit
+    mode avoids taking write locks or creating journal files here, and each
+    query still sees the latest committed settings.
     """
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(f"file:{DB_FILE}?mode=ro", uri=True,
+                               isolation_level=None, check_same_thread=False)
+        # Serve repeated reloads from memory: 8 MB page cache, 64 MB mmap
+        conn.executescript(
+            "PRAGMA cache_size=-8192; PRAGMA mmap_size=67108864; PRAGMA temp_store=MEMORY;"
+        )
+        _conn = conn
+    return _conn
+
+
+def _db_version() -> tuple:
+    """Modification stamps of the database file and its WAL.
+
+    Committed writes land in the -wal file first, so both are checked.
+    """
+    stamps = []
+    for path in (DB_FILE, DB_FILE + '-wal'):
+        try:
+            st = os.stat(path)
+        except OSError:
+            stamps.append(None)
+        else:
+            stamps.append((st.st_mtime_ns, st.st_size))
+    return tuple(stamps)
 
-    def __init__(self):
-        self._db_config = _get_config_from_db()
-
-    def _get(self, key: str, default: str) -> str:
-        """Get config value from database or default."""
-        if key in self._db_config and self._db_config[key]:
-            return self._db_config[key]
-        return default
-
-    @property
-    def LLM_PROVIDER(self) -> str:
-        return self._get('llm_provider', DEFAULT_CONFIG['llm_provider'])
-
-    @property
-    def OPENAI_API_KEY(self) -> str:
-        return self._get('openai_api_key', DEFAULT_CONFIG['openai_api_key'])
-
-    @property
-    def OPENAI_MODEL(self) -> str:
-        return self._get('openai_model', DEFAULT_CONFIG['openai_model'])
-
-    @property
-    def GEMINI_API_KEY(self) -> str:
-        return self._get('gemini_api_key', DEFAULT_CONFIG['gemini_api_key'])
-
-    @property
-    def GEMINI_MODEL(self) -> str:
-        return self._get('gemini_model', DEFAULT_CONFIG['gemini_model'])
 
-    @property
-    def RECIPE_LANG(self) -> str:
-        return self._get('recipe_lang', DEFAULT_CONFIG['recipe_lang'])
+# Database version the cached settings were read at, None before the first load
+_loaded_version: tuple | None = None
 
-    @property
-    def MEALIE_API_KEY(self) -> str:
-        return self._get('mealie_api_key', DEFAULT_CONFIG['mealie_api_key'])
 
-    @property
-    def MEALIE_HOST(self) -> str:
-        return self._get('mealie_host', DEFAULT_CONFIG['mealie_host'])
+@functools.lru_cache(maxsize=1)
+def _get_config_from_db() -> Mapping[str, str]:
+    """Load all configuration values from SQLite database.
 
-    @property
-    def TANDOOR_API_KEY(self) -> str:
-        return self._get('tandoor_api_key', DEFAULT_CONFIG['tandoor_api_key'])
+    Returns the stored values layered over a read-only view of the defaults;
+    empty values in the database fall back to the defaults, so the result
+    maps every key to its effective value. The result is cached until
+    Config.reload() is called.
+    """
+    global _loaded_version
+    # Stamp before reading, so a write racing with this load triggers the next reload
+    _loaded_version = _db_version()
+    try:
+        with _conn_lock:
+            # Rows come back as (key, value) tuples that dict() consumes directly
+            stored = dict(_get_connection().execute("SELECT key, value FROM config WHERE value != ''"))
+    except sqlite3.OperationalError:
+        # Database file or table doesn't exist yet (the UI creates both), use defaults
+        stored = {}
 
-    @property
-    def TANDOOR_HOST(self) -> str:
-        return self._get('tandoor_host', DEFAULT_CONFIG['tandoor_host'])
+    return ChainMap(stored, _DEFAULTS)
 
-    @property
-    def TARGET_LANGUAGE(self) -> str:
-        return self._get('target_language', DEFAULT_CONFIG['target_language'])
 
-    @property
-    def OUTPUT_TARGET(self) -> str:
-        return self._get('output_target', DEFAULT_CONFIG['output_target'])
+# Config keys exposed as booleans, and the values that count as true
+_BOOL_KEYS = frozenset({'llm_semantic_cache', 'export_to_both', 'confirm_before_upload'})
+_TRUE_VALUES = frozenset({'true', '1', 'yes', 'on'})
 
-    @property
-    def EXPORT_TO_BOTH(self) -> bool:
-        value = self._get('export_to_both', DEFAULT_CONFIG['export_to_both'])
-        return value.lower() in ('true', '1', 'yes', 'on')
+# Config attribute name (e.g. OPENAI_MODEL) -> database key (openai_model)
+_ATTR_MAP = {key.upper(): key for key in DEFAULT_CONFIG}
 
-    @property
-    def WHISPER_MODEL(self) -> str:
-        return self._get('whisper_model', DEFAULT_CONFIG['whisper_model'])
 
-    @property
-    def CONFIRM_BEFORE_UPLOAD(self) -> bool:
-        value = self._get('confirm_before_upload', DEFAULT_CONFIG['confirm_before_upload'])
-        return value.lower() in ('true', '1', 'yes', 'on')
+class Config:
+    """Configuration class that reads from SQLite database.
 
-    @property
-    def HF_TOKEN(self) -> str:
-        return self._get('hf_token', DEFAULT_CONFIG['hf_token'])
+    Uses default values if database is not available or value is not set.
+    The database is read on the first attribute access, not at import time,
+    and each value is resolved once and then stored in its slot until
+    reload() is called.
+    """
 
-    @property
-    def YT_DLP_COOKIES_FILE(self) -> str:
-        return self._get('yt_dlp_cookies_file', DEFAULT_CONFIG['yt_dlp_cookies_file'])
+    # One slot per setting; an empty slot falls through to __getattr__
+    __slots__ = tuple(_ATTR_MAP)
+
+    LLM_PROVIDER: str
+    OPENAI_API_KEY: str
+    OPENAI_MODEL: str
+    GEMINI_API_KEY: str
+    GEMINI_MODEL: str
+    LLM_SEMANTIC_CACHE: bool
+    RECIPE_LANG: str
+    MEALIE_API_KEY: str
+    MEALIE_HOST: str
+    TANDOOR_API_KEY: str
+    TANDOOR_HOST: str
+    TARGET_LANGUAGE: str
+    OUTPUT_TARGET: str
+    EXPORT_TO_BOTH: bool
+    WHISPER_MODEL: str
+    CONFIRM_BEFORE_UPLOAD: bool
+    HF_TOKEN: str
+    YT_DLP_COOKIES_FILE: str
+    YT_DLP_COOKIES_BROWSER: str
 
-    @property
-    def YT_DLP_COOKIES_BROWSER(self) -> str:
-        return self._get('yt_dlp_cookies_browser', DEFAULT_CONFIG['yt_dlp_cookies_browser'])
+    def _get(self, key: str, default: str) -> str:
+        """Get config value from database or default."""
+        return _get_config_from_db().get(key) or default
+
+    def __getattr__(self, name: str):
+        # Only called when the slot for name is still empty
+        key = _ATTR_MAP.get(name)
+        if key is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        value = self._get(key, DEFAULT_CONFIG[key])
+        if key in _BOOL_KEYS:
+            value = value.lower() in _TRUE_VALUES
+        setattr(self, name, value)
+        return value
 
     def reload(self):
-        """Reload configuration from database."""
-        self._db_config = _get_config_from_db()
+        """Reload configuration from database.
+
+        A no-op costing two stat calls when the database has not changed
+        since it was last read.
+        """
+        if _loaded_version is not None and _db_version() == _loaded_version:
+            return
+        _get_config_from_db.cache_clear()
+        for name in self.__slots__:
+            try:
+                delattr(self, name)
+            except AttributeError:
+                pass
 
 
 # Global config instance
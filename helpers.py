@@ -1,9 +1,15 @@
 from config import config
+import functools
 import logging
+import os
 import re
+import subprocess
+import threading
+import orjson
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from types import MappingProxyType
 
 
 # ==============================================================================
@@ -52,16 +58,82 @@ def create_http_session() -> requests.Session:
         backoff_factor=0.5,
         status_forcelist=[500, 502, 503, 504],
     )
-    adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=10, pool_maxsize=10)
+    adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=10, pool_maxsize=50)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
 
 
+_http_local = threading.local()
+
+
+def get_http_session() -> requests.Session:
+    """Return this thread's HTTP session, so connection pools are reused.
+
+    requests.Session is not thread-safe (its cookie jar and adapters are
+    shared state), so concurrent uploads each get their own.
+    """
+    session = getattr(_http_local, "session", None)
+    if session is None:
+        session = _http_local.session = create_http_session()
+    return session
+
+
+# ==============================================================================
+# Media Utilities
+# ==============================================================================
+
+def probe_media(path: str) -> MappingProxyType:
+    """Get the ffprobe format and stream metadata of a media file.
+    
+    The result is cached per path and modification time, so the pipeline
+    stages working on the same video share a single ffprobe run.
+    
+    Args:
+        path: Path to the media file.
+        
+    Returns:
+        Read-only ffprobe JSON output, or an empty mapping if probing fails.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = 0
+    return _probe_media(path, mtime)
+
+
+@functools.lru_cache(maxsize=32)
+def _probe_media(path: str, mtime: int) -> MappingProxyType:
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-print_format", "json",
+        "-show_format", "-show_streams",
+        path
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, check=True)
+        return MappingProxyType(orjson.loads(result.stdout))
+    except (subprocess.CalledProcessError, orjson.JSONDecodeError):
+        return MappingProxyType({})
+
+
+def get_media_duration(path: str, default: float = 0.0) -> float:
+    """Get a media file's duration in seconds, or default if unknown."""
+    try:
+        return float(probe_media(path)["format"]["duration"])
+    except (KeyError, TypeError, ValueError):
+        return default
+
+
 # ==============================================================================
 # Parsing Utilities
 # ==============================================================================
 
+# First number in a string, with "." or "," as the decimal separator
+_NUM_RE = re.compile(r"(\d+(?:[.,]\d+)?)")
+# ISO 8601 time-only duration such as PT1H30M
+_ISO_DURATION_RE = re.compile(r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?", re.IGNORECASE)
+
 def coerce_num(val: str) -> float:
     """Convert string quantity to float, handling ranges and locales.
     
@@ -100,7 +172,7 @@ def parse_nutrition_value(value: str | None) -> float:
     if not value:
         return 0
     # Extract the first number from the string
-    match = re.search(r"(\d+(?:[.,]\d+)?)", str(value))
+    match = _NUM_RE.search(str(value))
     if match:
         return float(match.group(1).replace(",", "."))
     return 0
@@ -116,7 +188,7 @@ def extract_servings(recipe_data: dict) -> int:
         Integer number of servings, defaults to 1 if not found.
     """
     ry = recipe_data.get("recipeYield") or ""
-    m = re.search(r"(\d+(?:[.,]\d+)?)", str(ry))
+    m = _NUM_RE.search(str(ry))
     if m:
         try:
             return int(float(m.group(1).replace(",", ".")))
@@ -142,9 +214,7 @@ def parse_iso_duration(duration: str) -> int:
     if not duration:
         return 0
     # Match patterns like PT1H30M, PT45M, PT2H
-    match = re.match(
-        r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?", str(duration).upper()
-    )
+    match = _ISO_DURATION_RE.match(str(duration))
     if not match:
         # Try simple numeric (assume minutes)
         try:
@@ -157,12 +227,31 @@ def parse_iso_duration(duration: str) -> int:
     return hours * 60 + minutes + (1 if seconds >= 30 else 0)
 
 
+def format_iso_duration(minutes: int) -> str:
+    """Format minutes as an ISO 8601 duration (inverse of parse_iso_duration).
+    
+    Examples:
+        >>> format_iso_duration(30)
+        'PT30M'
+        >>> format_iso_duration(90)
+        'PT1H30M'
+        >>> format_iso_duration(120)
+        'PT2H'
+    """
+    hours, minutes = divmod(max(0, int(minutes)), 60)
+    if hours and minutes:
+        return f"PT{hours}H{minutes}M"
+    if hours:
+        return f"PT{hours}H"
+    return f"PT{minutes}M"
+
+
 # ==============================================================================
 # Language Utilities
 # ==============================================================================
 
 # Map language codes to full names
-_LANG_NAMES = {
+_LANG_NAMES = MappingProxyType({
     "he": "Hebrew",
     "en": "English",
     "es": "Spanish",
@@ -171,15 +260,20 @@ _LANG_NAMES = {
     "it": "Italian",
     "ar": "Arabic",
     "ru": "Russian",
-}
-
+})
 
-def _get_target_lang() -> str:
-    return _LANG_NAMES.get(config.TARGET_LANGUAGE, config.TARGET_LANGUAGE)
 
+# The prompt caches are keyed on the configured language code, so a warm call
+# is one config attribute read plus one cache lookup, and a changed setting
+# takes effect without any invalidation.
 
 def get_recipe_system_prompt() -> str:
-    target_lang = _get_target_lang()
+    return _recipe_system_prompt(config.TARGET_LANGUAGE)
+
+
+@functools.lru_cache(maxsize=16)
+def _recipe_system_prompt(lang_code: str) -> str:
+    target_lang = _LANG_NAMES.get(lang_code, lang_code)
     return f"""You are a culinary data normalizer.
 Return a single valid JSON object in Schema.org JSON-LD for a Recipe.
 MUST be strictly valid JSON (no comments, no trailing commas).
@@ -192,6 +286,8 @@ Required fields:
 - "description" (1–2 short sentences)
 - "datePublished" (ISO 8601)
 - "recipeYield" (string)
+- "prepTime", "cookTime", "totalTime" (ISO 8601 durations, e.g. "PT15M", "PT1H30M"; estimate from the steps if not stated)
+- "nutrition" (per-serving NutritionInformation estimate: {{ "@type": "NutritionInformation", "calories": "450 kcal", "proteinContent": "20 g", "fatContent": "18 g", "carbohydrateContent": "55 g" }})
 - "recipeInstructions" (array of HowToStep objects: {{ "@type": "HowToStep", "text": "<step>" }})
 
 Ingredients:
@@ -216,12 +312,18 @@ Ingredients:
 General rules:
 - Keep instructions chronological; one step per HowToStep.
 - Only output the JSON object (no explanations).
+- Output minified JSON (no indentation or line breaks).
 - ALL TEXT MUST BE IN {target_lang}.
 """
 
 
 def get_yield_nutrition_prompt() -> str:
-    target_lang = _get_target_lang()
+    return _yield_nutrition_prompt(config.TARGET_LANGUAGE)
+
+
+@functools.lru_cache(maxsize=16)
+def _yield_nutrition_prompt(lang_code: str) -> str:
+    target_lang = _LANG_NAMES.get(lang_code, lang_code)
     return f"""You are a registered-dietitian-style assistant.
 Given a recipe's ingredients and instructions, estimate:
 - servings (number of portions; if unclear, infer a reasonable integer based on ingredient amounts)
@@ -256,4 +358,5 @@ All nutrition values are per serving.
 Do not invent impossible numbers; keep them plausible.
 Estimate times based on the complexity of the recipe and cooking methods described.
 Output recipeYield in {target_lang}.
+Output minified JSON (no indentation or line breaks).
 """
@@ -3,14 +3,30 @@ Image extraction module for extracting the best dish image from cooking videos.
 Uses LLM vision to analyze frames and select the most appealing shot of the finished dish.
 """
 
+import io
 import os
+import sqlite3
 import subprocess
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from llm_providers import get_image_selector
-from helpers import setup_logger
+from llm_providers.base import FRAME_MAX_SIZE
+from config import config
+from helpers import get_media_duration, setup_logger
+from llm_cache import MEDIA_TTL, file_fingerprint, get_cache, make_key
 
 logger = setup_logger(__name__)
 
+# The best-scoring group of near-identical frames is chosen without the LLM
+# when its score is at least this many times that of the runner-up
+HEURISTIC_MARGIN = 1.5
+
+# Otherwise every frame of this many best-scoring groups goes to the LLM
+SHORTLIST_GROUPS = 3
+
+# Maximum differing bits between the average hashes of near-identical frames
+DUPLICATE_HASH_DISTANCE = 6
+
 
 class ImageExtractor:
     """
@@ -33,6 +49,21 @@ class ImageExtractor:
         Returns:
             Path to the best image file, or None if extraction fails.
         """
+        return self.extract_candidates(num_candidates)['best_image']
+
+    def extract_candidates(self, num_candidates: int = 12) -> dict:
+        """
+        Extract candidate frames and save an enhanced copy of the best one.
+        
+        Args:
+            num_candidates: Number of frames to extract and analyze.
+        
+        Returns:
+            Dictionary containing:
+            - 'best_image': Path to the AI-selected best image, or None
+            - 'best_index': Index of the best image in candidates
+            - 'candidates': List of paths to all candidate images
+        """
         logger.info(f"[Extract Image] Starting image extraction from video: {self.video_path}")
         
         # Focus on the last portion of the video where finished dish is more likely
@@ -40,36 +71,152 @@ class ImageExtractor:
         frames = self._extract_frames_weighted_end(num_candidates)
         if not frames:
             logger.warning("[Extract Image] No frames could be extracted from video")
-            return None
+            return {'best_image': None, 'best_index': 0, 'candidates': []}
         logger.info(f"[Extract Image] Extracted {len(frames)} candidate frames")
 
-        # Use LLM to select the best frame
+        # Copy to final output location with descriptive name
+        output_path = os.path.join(self.dish_dir, "dish.jpg")
+        enhanced = [os.path.join(self.frames_dir, f"dish_enhanced_{i:02d}.jpg") for i in range(len(frames))]
+
         try:
-            logger.info(f"[Extract Image] Using LLM to select best frame from {len(frames)} candidates...")
-            selector = get_image_selector()
-            best_frame_idx = selector.select_best_frame(frames)
-            logger.info(f"[Extract Image] LLM selected frame index: {best_frame_idx}")
-        except Exception as e:
-            logger.error(f"[Extract Image] LLM selection failed: {e}")
-            best_frame_idx = None
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                # Enhance candidates while the LLM decides, latest (likeliest) first
+                pending = {
+                    i: pool.submit(self._enhance_frame, frames[i], enhanced[i])
+                    for i in reversed(range(len(frames)))
+                }
 
-        if best_frame_idx is None:
-            # Fallback: use the last frame (most likely to show finished dish)
-            best_frame_idx = len(frames) - 1
-            logger.info(f"[Extract Image] Using fallback frame index: {best_frame_idx}")
+                # Use LLM to select the best frame
+                logger.info(f"[Extract Image] Using LLM to select best frame from {len(frames)} candidates...")
+                best_frame_idx = self._select_best_frame(frames)
+                logger.info(f"[Extract Image] LLM selected frame index: {best_frame_idx}")
 
-        best_frame = frames[best_frame_idx]
-        logger.debug(f"[Extract Image] Selected frame {best_frame_idx}: {best_frame}")
-        
-        # Copy to final output location with descriptive name
-        output_path = os.path.join(self.dish_dir, "dish.jpg")
-        
-        # Create high-quality version of the selected frame
-        logger.info("[Extract Image] Enhancing selected frame...")
-        self._enhance_frame(best_frame, output_path)
+                if best_frame_idx is None:
+                    # Fallback: use the last frame (most likely to show finished dish)
+                    best_frame_idx = len(frames) - 1
+                    logger.info(f"[Extract Image] Using fallback frame index: {best_frame_idx}")
+
+                for i, future in pending.items():
+                    if i != best_frame_idx:
+                        future.cancel()
+                best_frame = frames[best_frame_idx]
+                logger.debug(f"[Extract Image] Selected frame {best_frame_idx}: {best_frame}")
+
+                # Create high-quality version of the selected frame
+                logger.info("[Extract Image] Enhancing selected frame...")
+                chosen = pending[best_frame_idx]
+                if chosen.cancel():
+                    self._enhance_frame(best_frame, output_path)
+                else:
+                    chosen.result()
+                    os.replace(enhanced[best_frame_idx], output_path)
+        finally:
+            # Drop the enhanced copies of the frames that were not chosen, even
+            # when selection or enhancement failed
+            for path in enhanced:
+                if os.path.exists(path):
+                    os.remove(path)
         
         logger.info(f"[Extract Image] Best dish image saved to: {output_path}")
-        return output_path
+        return {
+            'best_image': output_path,
+            'best_index': best_frame_idx,
+            'candidates': frames
+        }
+
+    def _select_best_frame(self, frames: list[str]) -> int | None:
+        """
+        Ask the LLM for the best frame, reusing an earlier answer for the same video.
+        Returns None if the selection fails.
+        """
+        try:
+            key = self._selection_key(len(frames))
+        except OSError as e:
+            logger.warning(f"[Extract Image] Could not fingerprint video: {e}")
+            key = None
+
+        cache = get_cache()
+        if key is not None:
+            try:
+                cached = cache.get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"[Extract Image] Selection cache lookup failed: {e}")
+                cached = None
+            if cached is not None:
+                logger.info("[Extract Image] Using cached frame selection")
+                return int(cached)
+
+        thumbnails = self._downscale_frames(frames)
+        shortlist = list(range(len(frames)))
+        ranked = _rank_frames(thumbnails)
+        if ranked:
+            top_score, top_idx, top_members = ranked[0]
+            # A static camera can merge every candidate into one group, which
+            # says nothing about the dish, so the LLM still decides then. The
+            # finished plate is shown last, so a held shot must reach the end.
+            if (len(ranked) > 1 and len(top_members) > 1
+                    and top_members[-1] == len(frames) - 1
+                    and top_score >= HEURISTIC_MARGIN * ranked[1][0]):
+                logger.info(f"[Extract Image] Heuristic picked frame {top_idx}, skipping LLM")
+                return top_idx
+            # Send the frames of the best groups, in video order
+            shortlist = sorted(idx for _, _, members in ranked[:SHORTLIST_GROUPS] for idx in members)
+
+        try:
+            choice = get_image_selector().select_best_frame([thumbnails[i] for i in shortlist])
+        except Exception as e:
+            logger.error(f"[Extract Image] LLM selection failed: {e}")
+            return None
+        best_frame_idx = shortlist[choice] if choice is not None else None
+
+        if best_frame_idx is not None and key is not None:
+            try:
+                cache.set(key, str(best_frame_idx), MEDIA_TTL)
+            except sqlite3.Error as e:
+                logger.warning(f"[Extract Image] Selection cache store failed: {e}")
+        return best_frame_idx
+
+    def _downscale_frames(self, frames: list[str]) -> list[str | bytes]:
+        """
+        Shrink the candidate frames for upload to the LLM, in memory.
+        One ffmpeg process scales all frames and pipes them out as MJPEG;
+        the full-size candidates on disk are left untouched. Falls back to the
+        original paths if ffmpeg fails.
+        """
+        scale = f"scale='min({FRAME_MAX_SIZE},iw)':'min({FRAME_MAX_SIZE},ih)':force_original_aspect_ratio=decrease,setsar=1"
+        graph = "".join(f"[{i}:v]{scale}[v{i}];" for i in range(len(frames)))
+        graph += "".join(f"[v{i}]" for i in range(len(frames)))
+        graph += f"concat=n={len(frames)}:v=1:a=0[out]"
+
+        cmd = ["ffmpeg", "-v", "error"]
+        for path in frames:
+            cmd += ["-i", path]
+        cmd += [
+            "-filter_complex", graph,
+            "-map", "[out]",
+            "-vsync", "0",
+            "-f", "image2pipe",
+            "-c:v", "mjpeg",
+            "-q:v", "3",
+            "pipe:1"
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True, check=True)
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"[Extract Image] Could not downscale frames: {e}")
+            return frames
+
+        thumbnails = _split_jpegs(result.stdout)
+        if len(thumbnails) != len(frames):
+            logger.warning("[Extract Image] Downscaled frame count mismatch, sending originals")
+            return frames
+        return thumbnails
+
+    def _selection_key(self, num_frames: int) -> str:
+        """Cache key for a frame selection on this video."""
+        provider = config.LLM_PROVIDER
+        model = config.GEMINI_MODEL if provider == "gemini" else config.OPENAI_MODEL
+        return make_key("frame_select", provider, model, file_fingerprint(self.video_path), str(num_frames))
 
     def _extract_frames_weighted_end(self, num_frames: int = 12) -> list[str]:
         """
@@ -86,68 +233,98 @@ class ImageExtractor:
         early_count = num_frames // 3
         late_count = num_frames - early_count
         
-        timestamps = []
-        
         # Early portion (first 2/3 of video)
-        if early_count > 0:
-            early_end = duration * 0.66
-            early_interval = early_end / (early_count + 1)
-            for i in range(early_count):
-                timestamps.append(early_interval * (i + 1))
-        
+        early_end = duration * 0.66
+        timestamps = _spaced(0.0, early_end, early_count)
+
         # Late portion (last 1/3 of video) - more densely sampled
-        late_start = duration * 0.66
-        late_duration = duration - late_start - 0.5  # Leave small margin at end
-        if late_count > 0 and late_duration > 0:
-            late_interval = late_duration / (late_count + 1)
-            for i in range(late_count):
-                timestamps.append(late_start + late_interval * (i + 1))
-
-        frame_paths = []
-        for i, ts in enumerate(timestamps):
-            frame_path = os.path.join(self.frames_dir, f"dish_candidate_{i:02d}.jpg")
-            
-            if not os.path.exists(frame_path):
-                cmd = [
-                    "ffmpeg", "-y", "-ss", str(ts),
-                    "-i", self.video_path,
-                    "-vframes", "1",
-                    "-q:v", "2",  # High quality JPEG
-                    frame_path
-                ]
-                try:
-                    subprocess.run(cmd, capture_output=True, check=True)
-                except subprocess.CalledProcessError as e:
-                    logger.warning(f"Failed to extract frame at {ts}s: {e}")
-                    continue
-
-            if os.path.exists(frame_path):
-                frame_paths.append(frame_path)
-
-        return frame_paths
+        late_duration = duration - early_end - 0.5  # Leave small margin at end
+        if late_duration > 0:
+            timestamps += _spaced(early_end, early_end + late_duration, late_count)
 
-    def _get_video_duration(self) -> float:
-        """Get video duration in seconds using ffprobe."""
+        frame_paths = [
+            os.path.join(self.frames_dir, f"dish_candidate_{i:02d}.jpg")
+            for i in range(len(timestamps))
+        ]
+        missing = [
+            (ts, path) for ts, path in zip(timestamps, frame_paths)
+            if not os.path.exists(path)
+        ]
+
+        if missing:
+            try:
+                self._extract_frames_batch(missing)
+            except subprocess.CalledProcessError as e:
+                logger.warning(f"Batch frame extraction failed, extracting one at a time: {e}")
+                # Each seek is an independent subprocess, so run a few at once
+                with ThreadPoolExecutor(max_workers=min(4, len(missing))) as pool:
+                    list(pool.map(lambda target: self._extract_frame(*target), missing))
+
+        return [path for path in frame_paths if os.path.exists(path)]
+
+    def _extract_frames_batch(self, targets: list[tuple[float, str]]):
+        """
+        Extract several frames with a single ffmpeg process.
+        Each timestamp is opened as its own input with a fast input seek, and
+        mapped to its own single-frame output, so the container is probed and
+        the process is spawned only once.
+        """
+        cmd = ["ffmpeg", "-y"]
+        for ts, _ in targets:
+            # Skip audio, subtitle and data streams when demuxing each input
+            cmd += ["-an", "-sn", "-dn", "-ss", str(ts), "-i", self.video_path]
+        for idx, (_, path) in enumerate(targets):
+            cmd += [
+                "-map", f"{idx}:v:0",
+                "-frames:v", "1",
+                "-q:v", "2",  # High quality JPEG
+                path
+            ]
+        subprocess.run(cmd, capture_output=True, check=True)
+
+    def _extract_frame(self, ts: float, frame_path: str):
+        """Extract a single frame at the given timestamp."""
         cmd = [
-            "ffprobe", "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            self.video_path
+            "ffmpeg", "-y", "-threads", "1",  # Runs alongside other extractions
+            "-an", "-sn", "-dn",
+            "-ss", str(ts),
+            "-i", self.video_path,
+            "-vframes", "1",
+            "-q:v", "2",  # High quality JPEG
+            frame_path
         ]
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return float(result.stdout.strip())
-        except (subprocess.CalledProcessError, ValueError):
-            return 30.0  # Default assumption
+            subprocess.run(cmd, capture_output=True, check=True)
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"Failed to extract frame at {ts}s: {e}")
+
+    def _get_video_duration(self) -> float:
+        """Get video duration in seconds using ffprobe."""
+        return get_media_duration(self.video_path, default=30.0)  # Default assumption
 
     def _enhance_frame(self, source_path: str, output_path: str):
         """
         Create an enhanced version of the selected frame.
         Applies mild sharpening and ensures good quality output.
+        Sharpens in-process with Pillow when it is installed, otherwise with ffmpeg.
         """
+        try:
+            from PIL import Image, ImageFilter
+        except ImportError:
+            pass
+        else:
+            try:
+                with Image.open(source_path) as img:
+                    sharpened = img.filter(ImageFilter.UnsharpMask(radius=2.5, percent=50, threshold=5))
+                    sharpened.save(output_path, "JPEG", quality=95, optimize=True)
+                return
+            except OSError as e:
+                logger.warning(f"[Extract Image] Pillow enhancement failed: {e}")
+
         cmd = [
             "ffmpeg", "-y",
             "-i", source_path,
+            "-an", "-sn", "-dn",
             "-vf", "unsharp=5:5:0.5:5:5:0.5",  # Mild sharpening
             "-q:v", "1",  # Highest JPEG quality
             output_path
@@ -159,6 +336,67 @@ class ImageExtractor:
             shutil.copy2(source_path, output_path)
 
 
+def _spaced(start: float, end: float, count: int) -> list[float]:
+    """Return count points evenly spaced strictly between start and end."""
+    step = (end - start) / (count + 1)
+    return [start + step * i for i in range(1, count + 1)]
+
+
+def _rank_frames(images: list[str | bytes]) -> list[tuple[float, int, list[int]]]:
+    """
+    Score frames by sharpness and colour, grouping near-identical ones.
+    Sharpness is the variance of a Laplacian edge image and colour the mean
+    saturation; near-duplicates are found by the distance of 8x8 average hashes.
+    Returns (score, index, members) for the best frame of each group, best
+    first, where members are the indices of all frames in the group in video
+    order; an empty list when Pillow is unavailable or a frame cannot be read.
+    """
+    try:
+        from PIL import Image, ImageFilter, ImageStat
+    except ImportError:
+        return []
+
+    laplacian = ImageFilter.Kernel((3, 3), (0, 1, 0, 1, -4, 1, 0, 1, 0), scale=1, offset=128)
+    scored = []
+    for idx, image in enumerate(images):
+        try:
+            with Image.open(io.BytesIO(image) if isinstance(image, bytes) else image) as img:
+                rgb = img.convert("RGB")
+        except OSError as e:
+            logger.warning(f"[Extract Image] Could not score frame {idx}: {e}")
+            return []
+        gray = rgb.convert("L")
+        sharpness = ImageStat.Stat(gray.filter(laplacian)).var[0]
+        saturation = ImageStat.Stat(rgb.convert("HSV").getchannel("S")).mean[0] / 255
+        pixels = list(gray.resize((8, 8)).getdata())
+        mean = sum(pixels) / len(pixels)
+        ahash = sum(1 << bit for bit, value in enumerate(pixels) if value > mean)
+        scored.append((sharpness * (0.5 + saturation), idx, ahash))
+
+    groups = []  # (score, index, hash, members) of each group's best frame
+    for score, idx, ahash in sorted(scored, reverse=True):
+        for group in groups:
+            if (group[2] ^ ahash).bit_count() <= DUPLICATE_HASH_DISTANCE:
+                group[3].append(idx)
+                break
+        else:
+            groups.append((score, idx, ahash, [idx]))
+    return [(score, idx, sorted(members)) for score, idx, _, members in groups]
+
+
+def _split_jpegs(data: bytes) -> list[bytes]:
+    """Split a stream of concatenated JPEG images on their start/end markers."""
+    images = []
+    start = data.find(b"\xff\xd8")
+    while start != -1:
+        end = data.find(b"\xff\xd9", start + 2)
+        if end == -1:
+            break
+        images.append(data[start:end + 2])
+        start = data.find(b"\xff\xd8", end + 2)
+    return images
+
+
 def extract_dish_image(video_path: str) -> str | None:
     """
     Convenience function to extract the best dish image from a video.
@@ -187,32 +425,4 @@ def extract_dish_image_candidates(video_path: str, num_candidates: int = 12) ->
         - 'best_index': Index of the best image in candidates
         - 'candidates': List of paths to all candidate images
     """
-    extractor = ImageExtractor(video_path)
-    
-    # Extract frames
-    frames = extractor._extract_frames_weighted_end(num_candidates)
-    if not frames:
-        return {'best_image': None, 'best_index': 0, 'candidates': []}
-    
-    # Use LLM to select the best frame
-    try:
-        from llm_providers import get_image_selector
-        selector = get_image_selector()
-        best_frame_idx = selector.select_best_frame(frames)
-    except Exception as e:
-        logger.error(f"LLM selection failed: {e}")
-        best_frame_idx = len(frames) - 1  # Fallback to last frame
-    
-    if best_frame_idx is None:
-        best_frame_idx = len(frames) - 1
-    
-    # Create enhanced version of the best frame
-    best_frame = frames[best_frame_idx]
-    output_path = os.path.join(extractor.dish_dir, "dish.jpg")
-    extractor._enhance_frame(best_frame, output_path)
-    
-    return {
-        'best_image': output_path,
-        'best_index': best_frame_idx,
-        'candidates': frames
-    }
+    return ImageExtractor(video_path).extract_candidates(num_candidates)
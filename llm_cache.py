@@ -0,0 +1,297 @@
+"""
+Response cache for LLM calls.
+
+Stores LLM responses in a SQLite file next to the application database so that
+identical prompts (e.g. the same video shared twice) are answered locally
+instead of hitting the paid API again. An optional semantic tier also matches
+paraphrased inputs by embedding similarity.
+"""
+
+import asyncio
+import functools
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import orjson
+
+from config import DATA_DIR, config
+from helpers import setup_logger
+
+logger = setup_logger(__name__)
+
+CACHE_FILE = os.path.join(DATA_DIR, 'llm_cache.db')
+
+# Time-to-live (seconds) per prompt type
+RECIPE_TTL = 86400
+NUTRITION_TTL = 3600
+
+# Media inputs (video frame selection, on-screen text) are stable per file
+MEDIA_TTL = 30 * 86400
+
+# Bytes read from the start of a media file to fingerprint it
+FINGERPRINT_BYTES = 65536
+
+# Semantic tier: embedding model and minimum cosine similarity for a hit
+SEMANTIC_MODEL = "all-MiniLM-L6-v2"
+SEMANTIC_THRESHOLD = 0.95
+
+# The model truncates its input at 256 tokens, so transcripts are embedded in
+# chunks of this many words and the chunk embeddings averaged
+SEMANTIC_CHUNK_WORDS = 150
+
+# Minimum ratio between the shorter and the longer transcript for a semantic hit
+SEMANTIC_LENGTH_RATIO = 0.8
+
+
+def make_key(*parts: str) -> str:
+    """Build a cache key from the parts that determine an LLM response."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def file_fingerprint(path: str) -> str:
+    """Fingerprint a media file by its first bytes and its size, without hashing it all."""
+    with open(path, "rb") as f:
+        head = f.read(FINGERPRINT_BYTES)
+    h = hashlib.blake2b(head, digest_size=16)
+    h.update(str(os.path.getsize(path)).encode())
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=64)
+def _scope_key(provider: str, model: str, system_prompt: str) -> str:
+    """Key for a provider, model and system prompt, hashed once per process."""
+    return make_key(provider, model, system_prompt)
+
+
+_embedder_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _load_embedder():
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        logger.warning("[LLM Cache] sentence-transformers not installed; semantic cache disabled")
+        return None
+    return SentenceTransformer(SEMANTIC_MODEL)
+
+
+def _get_embedder():
+    """Load the sentence embedding model once, or None if it is not installed."""
+    # Lookups run in worker threads, so only one of them may load the model
+    with _embedder_lock:
+        return _load_embedder()
+
+
+def _embed(embedder, text: str):
+    """Embed text across its full length as the normalized mean of its chunk embeddings."""
+    import numpy as np
+
+    words = text.split()
+    chunks = [
+        " ".join(words[i:i + SEMANTIC_CHUNK_WORDS])
+        for i in range(0, len(words), SEMANTIC_CHUNK_WORDS)
+    ] or [""]
+    vectors = embedder.encode(chunks, normalize_embeddings=True).astype(np.float32)
+    mean = vectors.mean(axis=0)
+    norm = float(np.linalg.norm(mean))
+    return mean / norm if norm else mean
+
+
+def _semantic_text(user_content: str) -> str | None:
+    """The transcript of a request, the only input compared semantically.
+
+    Requests without one (ingredient-based estimates, batches) carry
+    structured data where a near match is not a safe substitute, so they get
+    no semantic lookup.
+    """
+    try:
+        payload = orjson.loads(user_content)
+    except orjson.JSONDecodeError:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    transcript = payload.get("transcript")
+    return transcript if isinstance(transcript, str) and transcript.strip() else None
+
+
+class LLMCache:
+    """SQLite-backed key/value cache with per-entry expiry."""
+
+    def __init__(self, path: str = CACHE_FILE):
+        self.path = path
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    scope TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    text_len INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_embeddings_scope ON embeddings (scope)')
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(embeddings)')}
+            if 'text_len' not in columns:
+                # Older entries embedded the whole request payload; drop them
+                conn.execute('DELETE FROM embeddings')
+                conn.execute('ALTER TABLE embeddings ADD COLUMN text_len INTEGER NOT NULL DEFAULT 0')
+            conn.commit()
+
+    def get(self, key: str) -> str | None:
+        """Return the cached value for key, or None if missing or expired."""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT value FROM responses WHERE key = ? AND expires_at > ?',
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl: int):
+        """Store value under key for ttl seconds."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('DELETE FROM responses WHERE expires_at <= ?', (now,))
+            conn.execute(
+                'INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, value, now + ttl)
+            )
+            conn.commit()
+
+    def get_similar(self, scope: str, text: str) -> str | None:
+        """Return a cached value whose input text is semantically close to text.
+
+        Only entries stored under the same scope (provider, model and system
+        prompt) and with a text of similar length are considered. Blocking;
+        async callers run it in a worker thread.
+        """
+        embedder = _get_embedder()
+        if embedder is None:
+            return None
+        import numpy as np
+
+        query = _embed(embedder, text)
+        min_len = int(len(text) * SEMANTIC_LENGTH_RATIO)
+        max_len = int(len(text) / SEMANTIC_LENGTH_RATIO)
+        best_score, best_value = 0.0, None
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT embedding, value FROM embeddings '
+                'WHERE scope = ? AND expires_at > ? AND text_len BETWEEN ? AND ?',
+                (scope, time.time(), min_len, max_len)
+            ).fetchall()
+        for blob, value in rows:
+            score = float(np.dot(query, np.frombuffer(blob, dtype=np.float32)))
+            if score > best_score:
+                best_score, best_value = score, value
+        if best_score >= SEMANTIC_THRESHOLD:
+            logger.info(f"[LLM Cache] Semantic hit (similarity {best_score:.3f})")
+            return best_value
+        return None
+
+    def set_similar(self, scope: str, text: str, value: str, ttl: int):
+        """Store value with the embedding of text for later similarity lookups.
+
+        Blocking; async callers run it in a worker thread.
+        """
+        embedder = _get_embedder()
+        if embedder is None:
+            return
+
+        embedding = _embed(embedder, text)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('DELETE FROM embeddings WHERE expires_at <= ?', (now,))
+            conn.execute(
+                'INSERT INTO embeddings (scope, embedding, value, expires_at, text_len) VALUES (?, ?, ?, ?, ?)',
+                (scope, embedding.tobytes(), value, now + ttl, len(text))
+            )
+            conn.commit()
+
+
+@functools.lru_cache(maxsize=1)
+def get_cache() -> LLMCache:
+    """Return the process-wide LLM response cache."""
+    return LLMCache()
+
+
+def cached_llm_call(func):
+    """Cache the responses of an async ``(self, system_prompt, user_content)`` LLM call.
+
+    The instance must expose ``provider`` and ``model``. The wrapped method
+    accepts an extra ``cache_ttl`` keyword argument. Only responses that parse
+    as JSON are stored, so a malformed reply is retried rather than replayed.
+    The semantic tier is used only when enabled in the configuration, and
+    only for requests that carry a transcript, matched on that transcript.
+    """
+    @functools.wraps(func)
+    async def wrapper(self, system_prompt: str, user_content: str, *, cache_ttl: int = RECIPE_TTL) -> str:
+        cache = get_cache()
+        # The system prompts are few and long, so their hash is memoized and
+        # only the user content is encoded and hashed per call
+        scope = _scope_key(self.provider, self.model, system_prompt)
+        key = make_key(scope, user_content)
+        semantic_text = _semantic_text(user_content) if config.LLM_SEMANTIC_CACHE else None
+
+        def lookup() -> str | None:
+            cached = cache.get(key)
+            if cached is None and semantic_text is not None:
+                cached = cache.get_similar(scope, semantic_text)
+            return cached
+
+        def store(result: str):
+            cache.set(key, result, cache_ttl)
+            if semantic_text is not None:
+                cache.set_similar(scope, semantic_text, result, cache_ttl)
+
+        # SQLite and the embedding model block, so keep them off the event loop
+        # that the other in-flight requests share
+        try:
+            cached = await asyncio.to_thread(lookup)
+        except sqlite3.Error as e:
+            logger.warning(f"[LLM Cache] Lookup failed: {e}")
+            cached = None
+        if cached is not None:
+            logger.info("[LLM Cache] Using cached LLM response")
+            return cached
+
+        result = await func(self, system_prompt, user_content)
+
+        try:
+            orjson.loads(result)
+        except (TypeError, orjson.JSONDecodeError):
+            return result
+        try:
+            await asyncio.to_thread(store, result)
+        except sqlite3.Error as e:
+            logger.warning(f"[LLM Cache] Store failed: {e}")
+        return result
+
+    return wrapper
@@ -4,48 +4,133 @@ Provides a common interface for different LLM providers.
 """
 
 from abc import ABC, abstractmethod
+import io
 import re
+from pathlib import Path
+
+_SEL_RE = re.compile(r"\d+")
+
+# Longest side (pixels) of frame files sent to the LLM; vision models
+# downscale to about this size at low detail anyway
+FRAME_MAX_SIZE = 512
+
+# Contact sheet layout: tiles per row and tile size in pixels
+SHEET_COLUMNS = 4
+SHEET_TILE = 256
+
+# Kept byte-identical across calls and sent first, so the provider's prompt
+# prefix cache can be reused between videos
+SELECTION_PROMPT = """You are analyzing frames from a cooking video to find the BEST image that describes and represents the dish being made.
+Each frame is numbered: either by an "[Image N]" label right after it, or by the number in the top-left corner of its tile when the frames are shown as a grid.
+
+Select the frame that best:
+1. DESCRIBES THE DISH - Shows what the dish actually is (ingredients, style, cuisine type are visible/recognizable)
+2. REPRESENTS THE FINAL RESULT - Shows the completed/finished dish, not preparation steps
+3. IDENTIFIES THE FOOD - A viewer can clearly understand what dish this is just by looking at the image
+4. Shows appetizing presentation with good lighting and the food as the main subject
+5. Has clear focus and attractive plating where the dish's key characteristics are visible
+
+PRIORITY: Choose the image that someone could look at and immediately understand "this is [dish name]". The image should capture the essence and identity of the dish.
+
+Respond with ONLY the number of the best frame.
+If none show a finished dish, pick the frame that best describes what food is being made.
+Just respond with the single number, nothing else."""
 
 
 class LLMImageSelector(ABC):
     """Abstract base class for LLM-based image selection."""
 
     @abstractmethod
-    def select_best_frame(self, frame_paths: list[str]) -> int | None:
+    def select_best_frame(self, frame_paths: list[str | bytes]) -> int | None:
         """
         Use LLM vision to select the best frame showing the finished dish.
         
         Args:
-            frame_paths: List of paths to candidate frame images.
+            frame_paths: Candidate frame images, as file paths or JPEG bytes.
         
         Returns:
             Index of the best frame, or None if selection fails.
         """
         pass
 
-    def _get_selection_prompt(self, num_frames: int) -> str:
-        """Get the prompt for frame selection."""
-        return f"""You are analyzing {num_frames} frames from a cooking video to find the BEST image that describes and represents the dish being made.
+    @staticmethod
+    def _read_frame(frame: str | bytes) -> bytes:
+        """
+        Return the JPEG bytes of a frame given as a path or as bytes.
+        Frame files are shrunk to FRAME_MAX_SIZE when Pillow is installed;
+        bytes are assumed to be prepared by the caller and passed through.
+        """
+        if isinstance(frame, bytes):
+            return frame
+        try:
+            from PIL import Image
+        except ImportError:
+            return Path(frame).read_bytes()
+        try:
+            with Image.open(frame) as img:
+                if max(img.size) <= FRAME_MAX_SIZE:
+                    return Path(frame).read_bytes()
+                small = img.convert("RGB")
+        except OSError:
+            return Path(frame).read_bytes()
+        small.thumbnail((FRAME_MAX_SIZE, FRAME_MAX_SIZE))
+        buffer = io.BytesIO()
+        small.save(buffer, "JPEG", quality=75, optimize=True)
+        return buffer.getvalue()
 
-Select the frame that best:
-1. DESCRIBES THE DISH - Shows what the dish actually is (ingredients, style, cuisine type are visible/recognizable)
-2. REPRESENTS THE FINAL RESULT - Shows the completed/finished dish, not preparation steps
-3. IDENTIFIES THE FOOD - A viewer can clearly understand what dish this is just by looking at the image
-4. Shows appetizing presentation with good lighting and the food as the main subject
-5. Has clear focus and attractive plating where the dish's key characteristics are visible
+    @classmethod
+    def _build_contact_sheet(cls, frames: list[str | bytes]) -> bytes | None:
+        """
+        Pack the frames into one JPEG grid, each tile labelled with its index.
+        Returns None if Pillow is not installed or a frame cannot be read.
+        """
+        try:
+            from PIL import Image, ImageDraw, ImageFont
+        except ImportError:
+            return None
 
-PRIORITY: Choose the image that someone could look at and immediately understand "this is [dish name]". The image should capture the essence and identity of the dish.
+        cols = min(SHEET_COLUMNS, len(frames))
+        rows = -(-len(frames) // cols)
+        sheet = Image.new("RGB", (cols * SHEET_TILE, rows * SHEET_TILE))
+        draw = ImageDraw.Draw(sheet)
+        try:
+            font = ImageFont.load_default(size=SHEET_TILE // 8)
+        except TypeError:  # Pillow < 10.1 has a single fixed-size default font
+            font = ImageFont.load_default()
 
-Respond with ONLY the number (0-{num_frames - 1}) of the best frame.
-If none show a finished dish, pick the frame that best describes what food is being made.
-Just respond with the single number, nothing else."""
+        for i, frame in enumerate(frames):
+            try:
+                with Image.open(io.BytesIO(cls._read_frame(frame))) as img:
+                    tile = img.convert("RGB")
+            except OSError:
+                return None
+            tile.thumbnail((SHEET_TILE, SHEET_TILE))
+            x = (i % cols) * SHEET_TILE
+            y = (i // cols) * SHEET_TILE
+            sheet.paste(tile, (x + (SHEET_TILE - tile.width) // 2, y + (SHEET_TILE - tile.height) // 2))
+            label_box = draw.textbbox((x + 6, y + 6), str(i), font=font)
+            draw.rectangle((label_box[0] - 4, label_box[1] - 4, label_box[2] + 4, label_box[3] + 4), fill="black")
+            draw.text((x + 6, y + 6), str(i), fill="yellow", font=font)
+
+        buffer = io.BytesIO()
+        sheet.save(buffer, "JPEG", quality=85)
+        return buffer.getvalue()
 
     def _parse_selection_response(self, response: str, max_idx: int) -> int | None:
         """Parse LLM response to get frame index."""
-        # Find first number in response
-        match = re.search(r"\d+", response.strip())
-        if match:
+        if not response:
+            return None
+        # The prompt asks for a bare number, so read the leading digits
+        text = response.lstrip()
+        end = 0
+        while end < len(text) and text[end] in "0123456789":
+            end += 1
+        if end:
+            idx = int(text[:end])
+        else:
+            # Otherwise find first number in response
+            match = _SEL_RE.search(text)
+            if not match:
+                return None
             idx = int(match.group())
-            if 0 <= idx < max_idx:
-                return idx
-        return None
+        return idx if 0 <= idx < max_idx else None
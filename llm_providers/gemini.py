@@ -3,51 +3,62 @@ Gemini LLM provider for image selection.
 Uses Google's Gemini API with vision capabilities.
 """
 
-from .base import LLMImageSelector
+import functools
+from .base import SELECTION_PROMPT, LLMImageSelector
 from config import config
 from helpers import setup_logger
 
 logger = setup_logger(__name__)
 
 
+@functools.lru_cache(maxsize=4)
+def _get_client(api_key: str):
+    """Return a shared Gemini client for the key, so its connection pool is reused."""
+    from google import genai
+
+    return genai.Client(api_key=api_key)
+
+
 class GeminiImageSelector(LLMImageSelector):
     """Image selector using Google Gemini's vision capabilities."""
 
-    def select_best_frame(self, frame_paths: list[str]) -> int | None:
+    def select_best_frame(self, frame_paths: list[str | bytes]) -> int | None:
         """
         Select best frame using Gemini vision.
         
         Args:
-            frame_paths: List of paths to candidate frame images.
+            frame_paths: Candidate frame images, as file paths or JPEG bytes.
         
         Returns:
             Index of the best frame, or None if selection fails.
         """
-        from google import genai
-        from google.genai import types
-
-        client = genai.Client(api_key=config.GEMINI_API_KEY)
-
-        # Prepare image parts
-        parts = []
-        for i, path in enumerate(frame_paths):
-            with open(path, "rb") as f:
-                image_data = f.read()
-            parts.append(types.Part.from_bytes(
-                data=image_data,
-                mime_type="image/jpeg"
-            ))
-            parts.append(types.Part.from_text(text=f"[Image {i}]"))
-
-        prompt = self._get_selection_prompt(len(frame_paths))
-        parts.append(types.Part.from_text(text=prompt))
-
+        if len(frame_paths) <= 1:
+            return 0 if frame_paths else None
+        client = _get_client(config.GEMINI_API_KEY)
         try:
             response = client.models.generate_content(
                 model=config.GEMINI_MODEL,
-                contents=[types.Content(role="user", parts=parts)],
+                contents=self._build_contents(frame_paths),
             )
             return self._parse_selection_response(response.text or "", len(frame_paths))
         except Exception as e:
             logger.error(f"Selection error: {e}")
             return None
+
+    def _build_contents(self, frame_paths: list[str | bytes]) -> list:
+        """Build the request contents: the prompt, then the frames."""
+        from google.genai import types
+
+        # Prepare image parts: one labelled contact sheet, or one part per frame
+        sheet = self._build_contact_sheet(frame_paths)
+        parts = [types.Part.from_text(text=SELECTION_PROMPT)]
+        if sheet is not None:
+            parts.append(types.Part.from_bytes(data=sheet, mime_type="image/jpeg"))
+        else:
+            for i, path in enumerate(frame_paths):
+                parts.append(types.Part.from_bytes(
+                    data=self._read_frame(path),
+                    mime_type="image/jpeg"
+                ))
+                parts.append(types.Part.from_text(text=f"[Image {i}]"))
+        return [types.Content(role="user", parts=parts)]
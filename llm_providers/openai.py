@@ -4,56 +4,75 @@ Uses OpenAI's API with vision capabilities.
 """
 
 import base64
-from .base import LLMImageSelector
+import functools
+from .base import SELECTION_PROMPT, LLMImageSelector
 from config import config
 from helpers import setup_logger
 
 logger = setup_logger(__name__)
 
+# Prepended to the base64 bytes so the data URL is decoded to str only once
+_DATA_URL_PREFIX = b"data:image/jpeg;base64,"
+
+
+@functools.lru_cache(maxsize=4)
+def _get_client(api_key: str):
+    """Return a shared OpenAI client for the key, so its connection pool is reused."""
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key)
+
 
 class OpenAIImageSelector(LLMImageSelector):
     """Image selector using OpenAI's vision capabilities."""
 
-    def select_best_frame(self, frame_paths: list[str]) -> int | None:
+    def select_best_frame(self, frame_paths: list[str | bytes]) -> int | None:
         """
         Select best frame using OpenAI vision.
         
         Args:
-            frame_paths: List of paths to candidate frame images.
+            frame_paths: Candidate frame images, as file paths or JPEG bytes.
         
         Returns:
             Index of the best frame, or None if selection fails.
         """
-        from openai import OpenAI
-
-        client = OpenAI(api_key=config.OPENAI_API_KEY)
-
-        # Encode frames as base64
-        image_contents = []
-        for i, frame_path in enumerate(frame_paths):
-            with open(frame_path, "rb") as f:
-                b64_image = base64.standard_b64encode(f.read()).decode("utf-8")
-            image_contents.append({
-                "type": "image_url",
-                "image_url": {
-                    "url": f"data:image/jpeg;base64,{b64_image}",
-                    "detail": "low"  # Use low detail for faster selection
-                }
-            })
-            image_contents.append({
-                "type": "text",
-                "text": f"[Image {i}]"
-            })
-
-        prompt = self._get_selection_prompt(len(frame_paths))
-        image_contents.append({"type": "text", "text": prompt})
-
+        if len(frame_paths) <= 1:
+            return 0 if frame_paths else None
+        client = _get_client(config.OPENAI_API_KEY)
         try:
             response = client.responses.create(
                 model=config.OPENAI_MODEL,
-                input=[{"role": "user", "content": image_contents}]
+                input=self._build_input(frame_paths)
             )
             return self._parse_selection_response(response.output_text or "", len(frame_paths))
         except Exception as e:
             logger.error(f"Selection error: {e}")
             return None
+
+    def _build_input(self, frame_paths: list[str | bytes]) -> list[dict]:
+        """Build the request input: the prompt, then the frames."""
+        # Encode frames as base64: one labelled contact sheet, or one image per frame
+        sheet = self._build_contact_sheet(frame_paths)
+        image_contents = [{"type": "text", "text": SELECTION_PROMPT}]
+        if sheet is not None:
+            # The grid needs full detail to keep each tile legible
+            image_contents.append(self._image_content(sheet, detail="high"))
+        else:
+            for i, frame_path in enumerate(frame_paths):
+                image_contents.append(self._image_content(self._read_frame(frame_path)))
+                image_contents.append({
+                    "type": "text",
+                    "text": f"[Image {i}]"
+                })
+        return [{"role": "user", "content": image_contents}]
+
+    @staticmethod
+    def _image_content(image_data: bytes, detail: str = "low") -> dict:
+        """Build an inline JPEG content part; low detail by default for faster selection."""
+        return {
+            "type": "image_url",
+            "image_url": {
+                "url": (_DATA_URL_PREFIX + base64.b64encode(image_data)).decode("ascii"),
+                "detail": detail
+            }
+        }
@@ -1,6 +1,10 @@
 import argparse
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import orjson
+
 from chef import Chef
 from config import config
 from helpers import setup_logger
@@ -27,51 +31,82 @@ def main(video_url: str):
     logger.info(f"[Download] Complete. Video saved to: {video_path}")
     
     dish_dir = os.path.join("tmp", vid_id)
-    transcriber = Transcriber(video_path)
     lang = config.TARGET_LANGUAGE
     
-    # Step: Transcribe - Get audio transcription (cached with language in filename)
+    # Transcription, on-screen text and the dish image each need only the
+    # downloaded video, so run them side by side, each with its own state
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        transcription_future = pool.submit(_transcribe, video_path, dish_dir, lang)
+        visual_future = pool.submit(_extract_visual_text, video_path, dish_dir, lang)
+        image_future = pool.submit(_extract_image, video_path, dish_dir)
+        transcription = transcription_future.result()
+        visual_text = visual_future.result()
+        image_path = image_future.result()
+    
+    # Combine audio transcription and visual text
+    combined_transcription = transcription
+    if visual_text:
+        combined_transcription = f"""=== AUDIO TRANSCRIPTION ===
+{transcription}
+
+=== ON-SCREEN TEXT (ingredients, instructions, etc.) ===
+{visual_text}"""
+    
+    return {
+        "title": title,
+        "description": description,
+        "video_path": video_path,
+        "transcription": combined_transcription,
+        "image_path": image_path
+    }
+
+
+def _load_cached(path: str) -> str | None:
+    """Read a cached text file in one call, or return None if it does not exist."""
+    try:
+        return Path(path).read_text()
+    except FileNotFoundError:
+        return None
+
+
+def _transcribe(video_path: str, dish_dir: str, lang: str) -> str:
+    """Get audio transcription (cached with language in filename)."""
     logger.info("[Transcribe] Starting audio transcription...")
     audio_cache = os.path.join(dish_dir, f"transcription_{lang}.txt")
-    if os.path.exists(audio_cache):
+    transcription = _load_cached(audio_cache)
+    if transcription is not None:
         logger.info(f"[Transcribe] Using cached transcription ({lang}).")
-        with open(audio_cache, "r") as f:
-            transcription = f.read()
     else:
-        transcription = transcriber.transcribe()
+        transcription = Transcriber(video_path).transcribe()
         with open(audio_cache, "w") as f:
             f.write(transcription)
     logger.info("[Transcribe] Complete.")
-    
-    # Step: Visual Text - Get visual text from video (cached with language in filename)
+    return transcription
+
+
+def _extract_visual_text(video_path: str, dish_dir: str, lang: str) -> str:
+    """Get visual text from video (cached with language in filename)."""
     logger.info("[Visual Text] Extracting on-screen text...")
-    visual_text = ""
     visual_cache = os.path.join(dish_dir, f"visual_{lang}.txt")
-    if os.path.exists(visual_cache):
+    visual_text = _load_cached(visual_cache)
+    if visual_text is not None:
         logger.info(f"[Visual Text] Using cached visual text ({lang}).")
-        with open(visual_cache, "r") as f:
-            visual_text = f.read()
     else:
+        visual_text = ""
         logger.info(f"[Visual Text] Extracting on-screen text from video using {config.LLM_PROVIDER} ({lang})...")
         try:
-            visual_text = transcriber.extract_visual_text()
+            visual_text = Transcriber(video_path).extract_visual_text()
             with open(visual_cache, "w") as f:
                 f.write(visual_text)
             logger.info(f"[Visual Text] Extracted {len(visual_text)} characters of visual text.")
         except Exception as e:
             logger.warning(f"[Visual Text] Could not extract visual text: {e}")
     logger.info("[Visual Text] Complete.")
-    
-    # Combine audio transcription and visual text
-    combined_transcription = transcription
-    if visual_text:
-        combined_transcription = f"""=== AUDIO TRANSCRIPTION ===
-{transcription}
+    return visual_text
 
-=== ON-SCREEN TEXT (ingredients, instructions, etc.) ===
-{visual_text}"""
-    
-    # Step: Extract Image - Extract best dish image from video (cached)
+
+def _extract_image(video_path: str, dish_dir: str) -> str | None:
+    """Extract best dish image from video (cached)."""
     logger.info("[Extract Image] Extracting best dish image from video...")
     image_path = None
     image_cache = os.path.join(dish_dir, "dish.jpg")
@@ -86,14 +121,7 @@ def main(video_url: str):
         except Exception as e:
             logger.warning(f"[Extract Image] Could not extract dish image: {e}")
     logger.info("[Extract Image] Complete.")
-    
-    return {
-        "title": title,
-        "description": description,
-        "video_path": video_path,
-        "transcription": combined_transcription,
-        "image_path": image_path
-    }
+    return image_path
 
 
 if __name__ == "__main__":
@@ -149,4 +177,4 @@ if __name__ == "__main__":
             
             logger.info("[Upload] Complete.")
                 
-    logger.info(json.dumps(recipe_data, ensure_ascii=False, indent=2))
+    logger.info(orjson.dumps(recipe_data, option=orjson.OPT_INDENT_2).decode())
@@ -8,7 +8,7 @@ recipe management systems (e.g., Tandoor, Mealie).
 from abc import ABC, abstractmethod
 import os
 
-from helpers import create_http_session, setup_logger
+from helpers import get_http_session, setup_logger
 
 
 class RecipeExporter(ABC):
@@ -29,7 +29,7 @@ class RecipeExporter(ABC):
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
         self._name = name
-        self._session = create_http_session()
+        self._session = get_http_session()
 
     @abstractmethod
     def create_recipe(self, recipe_data: dict) -> dict:
@@ -1,14 +1,18 @@
 import os
+import sqlite3
 import subprocess
-import sys
 import time
 from faster_whisper import WhisperModel
 
 from config import config
-from helpers import setup_logger
+from helpers import get_media_duration, setup_logger
+from llm_cache import MEDIA_TTL, file_fingerprint, get_cache, make_key
 
 logger = setup_logger(__name__)
 
+# Audio extraction progress is logged every this many percent
+PROGRESS_STEP = 25
+
 
 class Transcriber:
     def __init__(
@@ -32,17 +36,7 @@ class Transcriber:
 
     def _get_video_duration(self) -> float:
         """Get video duration in seconds using ffprobe."""
-        duration_cmd = [
-            "ffprobe", "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            self.video_path
-        ]
-        try:
-            result = subprocess.run(duration_cmd, capture_output=True, text=True, check=True)
-            return float(result.stdout.strip())
-        except (subprocess.CalledProcessError, ValueError):
-            return 0.0
+        return get_media_duration(self.video_path)
 
     def _extract_audio(self, overwrite: bool = False):
         """Extract mono WAV audio at 16kHz using ffmpeg with progress indicator."""
@@ -71,9 +65,10 @@ class Transcriber:
             text=True
         )
         
-        # Track progress
+        # Track progress. Other stages log concurrently, so progress is logged
+        # in steps rather than redrawn in place on stdout
         start_time = time.time()
-        current_time = 0.0
+        next_report = PROGRESS_STEP
         
         if process.stdout:
             for line in process.stdout:
@@ -84,13 +79,10 @@ class Transcriber:
                         current_time = out_time_ms / 1_000_000  # Convert to seconds
                         if duration > 0:
                             progress = min(100, (current_time / duration) * 100)
-                            elapsed = time.time() - start_time
-                            # Print progress bar
-                            bar_width = 30
-                            filled = int(bar_width * progress / 100)
-                            bar = "█" * filled + "░" * (bar_width - filled)
-                            sys.stdout.write(f"\r[Transcribe] Extracting audio: [{bar}] {progress:.0f}% ({elapsed:.1f}s)")
-                            sys.stdout.flush()
+                            if progress >= next_report and progress < 100:
+                                elapsed = time.time() - start_time
+                                logger.info(f"[Transcribe] Extracting audio: {progress:.0f}% ({elapsed:.1f}s)")
+                                next_report = (progress // PROGRESS_STEP + 1) * PROGRESS_STEP
                     except (ValueError, IndexError):
                         pass
                 elif line == "progress=end":
@@ -98,11 +90,9 @@ class Transcriber:
         
         process.wait()
         
-        # Clear progress line and print completion
         if duration > 0:
             elapsed = time.time() - start_time
-            sys.stdout.write(f"\r[Transcribe] Audio extraction complete ({elapsed:.1f}s)                    \n")
-            sys.stdout.flush()
+            logger.info(f"[Transcribe] Audio extraction complete ({elapsed:.1f}s)")
         
         if process.returncode != 0:
             raise subprocess.CalledProcessError(process.returncode, cmd)
@@ -129,17 +119,7 @@ class Transcriber:
 
     def _get_file_duration(self, file_path: str) -> float:
         """Get media file duration in seconds using ffprobe."""
-        duration_cmd = [
-            "ffprobe", "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            file_path
-        ]
-        try:
-            result = subprocess.run(duration_cmd, capture_output=True, text=True, check=True)
-            return float(result.stdout.strip())
-        except (subprocess.CalledProcessError, ValueError):
-            return 0.0
+        return get_media_duration(file_path)
 
     def transcribe(self, language: str | None = None) -> str:
         """Return the full transcription as plain text.
@@ -167,18 +147,39 @@ class Transcriber:
         """
         Extract on-screen text from video using LLM vision capabilities.
         Supports both Gemini (direct video upload) and OpenAI (frame extraction).
+        Responses are cached per video content, provider, model and prompt.
 
         Returns:
             Extracted text from video as a single string.
         """
         if config.LLM_PROVIDER == "gemini":
-            return self._extract_visual_text_gemini()
+            extract, model = self._extract_visual_text_gemini, config.GEMINI_MODEL
         elif config.LLM_PROVIDER == "openai":
-            return self._extract_visual_text_openai()
+            extract, model = self._extract_visual_text_openai, config.OPENAI_MODEL
         else:
             raise ValueError(
                 f"Visual text extraction not supported for provider: {config.LLM_PROVIDER}")
 
+        cache = get_cache()
+        try:
+            key = make_key("visual_text", config.LLM_PROVIDER, model,
+                           self._get_visual_text_prompt(), file_fingerprint(self.video_path))
+            cached = cache.get(key)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"[Visual Text] Cache lookup failed: {e}")
+            key = cached = None
+        if cached is not None:
+            logger.info("[Visual Text] Using cached LLM response")
+            return cached
+
+        text = extract()
+        if key is not None and text:
+            try:
+                cache.set(key, text, MEDIA_TTL)
+            except sqlite3.Error as e:
+                logger.warning(f"[Visual Text] Cache store failed: {e}")
+        return text
+
     def _extract_visual_text_gemini(self) -> str:
         """Extract visual text using Gemini's direct video understanding."""
         from google import genai
@@ -221,6 +222,7 @@ class Transcriber:
     def _extract_visual_text_openai(self) -> str:
         """Extract visual text using OpenAI's vision API with extracted frames."""
         import base64
+        import mmap
         from openai import OpenAI
 
         client = OpenAI(api_key=config.OPENAI_API_KEY)
@@ -233,12 +235,14 @@ class Transcriber:
         # Encode frames as base64
         image_contents = []
         for frame_path in frames:
-            with open(frame_path, "rb") as f:
-                b64_image = base64.standard_b64encode(f.read()).decode("utf-8")
+            # Encode straight from a read-only mapping of the file, with no
+            # intermediate bytes copy of the full-size frame
+            with open(frame_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data_url = (b"data:image/jpeg;base64," + base64.b64encode(mm)).decode("ascii")
             image_contents.append({
                 "type": "image_url",
                 "image_url": {
-                    "url": f"data:image/jpeg;base64,{b64_image}",
+                    "url": data_url,
                     "detail": "high"
                 }
             })
@@ -266,20 +270,8 @@ class Transcriber:
         frames_dir = os.path.join(dish_dir, "frames")
         os.makedirs(frames_dir, exist_ok=True)
 
-        # Get video duration
-        duration_cmd = [
-            "ffprobe", "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            self.video_path
-        ]
-
-        try:
-            result = subprocess.run(
-                duration_cmd, capture_output=True, text=True, check=True)
-            duration = float(result.stdout.strip())
-        except (subprocess.CalledProcessError, ValueError):
-            duration = 30.0  # Default assumption
+        # Get video duration (probed once and shared with the other stages)
+        duration = get_media_duration(self.video_path, default=30.0)  # Default assumption
 
         # Calculate timestamps
         margin = min(0.5, duration * 0.05)
@@ -10,10 +10,10 @@ import base64
 import secrets
 import threading
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from functools import wraps
 
-from dotenv import load_dotenv
 from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, make_response
 from flask_socketio import SocketIO, emit, join_room, leave_room
 
@@ -240,6 +240,7 @@ def settings():
         config['openai_model'] = request.form.get('openai_model', '')
         config['gemini_api_key'] = request.form.get('gemini_api_key', '')
         config['gemini_model'] = request.form.get('gemini_model', '')
+        config['llm_semantic_cache'] = 'true' if request.form.get('llm_semantic_cache') else 'false'
         config['recipe_lang'] = request.form.get('recipe_lang', 'hebrew')
         config['mealie_api_key'] = request.form.get('mealie_api_key', '')
         config['mealie_host'] = request.form.get('mealie_host', '')
@@ -1123,27 +1124,13 @@ def process_video_job(job_id, jm):
             # Export to single target
             upload_targets = [config.OUTPUT_TARGET]
 
-        upload_results = []
-        
-        for target in upload_targets:
-            try:
-                if target == 'tandoor':
-                    from tandoor import Tandoor
-                    tandoor = Tandoor()
-                    result = tandoor.create_recipe(recipe_data)
-                    if image_path and result.get("id"):
-                        tandoor.upload_image(result["id"], image_path)
-                    upload_results.append(('tandoor', True, None))
-                elif target == 'mealie':
-                    from mealie import Mealie
-                    mealie = Mealie()
-                    result = mealie.create_recipe(recipe_data)
-                    recipe_slug = result.get("slug") or result.get("id")
-                    if image_path and recipe_slug:
-                        mealie.upload_image(recipe_slug, image_path)
-                    upload_results.append(('mealie', True, None))
-            except Exception as upload_error:
-                upload_results.append((target, False, str(upload_error)))
+        # Targets are independent services, so upload to them side by side
+        with ThreadPoolExecutor(max_workers=len(upload_targets)) as pool:
+            upload_results = [
+                result for result in pool.map(
+                    lambda target: _upload_recipe(target, recipe_data, image_path), upload_targets)
+                if result is not None
+            ]
 
         # Determine final output target for history
         final_target = ', '.join(upload_targets) if config.EXPORT_TO_BOTH else config.OUTPUT_TARGET
@@ -1171,6 +1158,32 @@ def process_video_job(job_id, jm):
         jm.fail_job(job_id, f'Error: {str(e)}')
 
 
+def _upload_recipe(target: str, recipe_data: dict, image_path: str | None) -> tuple | None:
+    """Upload a recipe and its image to one target.
+
+    Returns (target, success, error), or None for an unknown target.
+    """
+    try:
+        if target == 'tandoor':
+            from tandoor import Tandoor
+            tandoor = Tandoor()
+            result = tandoor.create_recipe(recipe_data)
+            if image_path and result.get("id"):
+                tandoor.upload_image(result["id"], image_path)
+        elif target == 'mealie':
+            from mealie import Mealie
+            mealie = Mealie()
+            result = mealie.create_recipe(recipe_data)
+            recipe_slug = result.get("slug") or result.get("id")
+            if image_path and recipe_slug:
+                mealie.upload_image(recipe_slug, image_path)
+        else:
+            return None
+        return (target, True, None)
+    except Exception as upload_error:
+        return (target, False, str(upload_error))
+
+
 # ===== WebSocket Handlers =====
 
 @socketio.on('connect')
@@ -1220,7 +1233,10 @@ def handle_cancel_upload(data):
 
 
 if __name__ == '__main__':
-    load_dotenv()
+    # Containers pass the environment directly; skip reading .env there
+    if os.getenv('SOCIAL_RECIPES_SKIP_DOTENV') != '1':
+        from dotenv import load_dotenv
+        load_dotenv()
     host = os.getenv('HOST', '0.0.0.0')
     port = int(os.getenv('PORT', '5006'))
     debug = os.getenv('FLASK_DEBUG', 'false').lower() in ('true', '1', 'yes')
@@ -3,8 +3,6 @@ Database module for Social Recipes UI
 Uses SQLite to store configuration, user data, jobs, and recipe history.
 """
 
-import os
-import json
 import sqlite3
 import hashlib
 import uuid
@@ -12,13 +10,10 @@ from datetime import datetime
 from contextlib import contextmanager
 from typing import Optional, List, Dict, Any
 
-# Import defaults from config module to avoid duplication
-from config import DEFAULT_CONFIG
+import orjson
 
-# Database file path - use /app/data for Docker persistence, fallback to local
-DATA_DIR = os.environ.get('DATA_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data'))
-os.makedirs(DATA_DIR, exist_ok=True)
-DB_FILE = os.path.join(DATA_DIR, 'social_recipes.db')
+# Import defaults and the database path from config module to avoid duplication
+from config import DB_FILE, DEFAULT_CONFIG
 
 
 @contextmanager
@@ -26,6 +21,8 @@ def get_db():
     """Context manager for database connections."""
     conn = sqlite3.connect(DB_FILE)
     conn.row_factory = sqlite3.Row
+    # Safe with WAL (set in init_db) and avoids an fsync on every commit
+    conn.execute('PRAGMA synchronous=NORMAL')
     try:
         yield conn
     finally:
@@ -36,6 +33,9 @@ def init_db():
     """Initialize the database with required tables."""
     with get_db() as conn:
         cursor = conn.cursor()
+
+        # WAL lets config and history reads run while a job is writing
+        cursor.execute('PRAGMA journal_mode=WAL')
         
         # Create users table
         cursor.execute('''
@@ -337,7 +337,7 @@ def create_history_entry(job_id: str, url: str, video_title: Optional[str],
     """Create a history entry for a completed/failed recipe extraction."""
     with get_db() as conn:
         cursor = conn.cursor()
-        recipe_json = json.dumps(recipe_data) if recipe_data else None
+        recipe_json = orjson.dumps(recipe_data).decode() if recipe_data else None
         cursor.execute('''
             INSERT INTO recipe_history
             (job_id, url, video_title, recipe_name, recipe_data, thumbnail_path,
@@ -377,8 +377,8 @@ def get_history(limit: int = 50, offset: int = 0,
             # Parse recipe_data JSON if present
             if item.get('recipe_data'):
                 try:
-                    item['recipe_data'] = json.loads(item['recipe_data'])
-                except json.JSONDecodeError:
+                    item['recipe_data'] = orjson.loads(item['recipe_data'])
+                except orjson.JSONDecodeError:
                     pass
             results.append(item)
         return results
@@ -395,8 +395,8 @@ def get_history_entry(history_id: int) -> Optional[Dict[str, Any]]:
             # Parse recipe_data JSON if present
             if item.get('recipe_data'):
                 try:
-                    item['recipe_data'] = json.loads(item['recipe_data'])
-                except json.JSONDecodeError:
+                    item['recipe_data'] = orjson.loads(item['recipe_data'])
+                except orjson.JSONDecodeError:
                     pass
             return item
     return None
@@ -575,8 +575,8 @@ def get_combined_history_and_jobs(limit: int = 50, offset: int = 0,
             # Parse recipe_data JSON if present
             if item.get('recipe_data'):
                 try:
-                    item['recipe_data'] = json.loads(item['recipe_data'])
-                except json.JSONDecodeError:
+                    item['recipe_data'] = orjson.loads(item['recipe_data'])
+                except orjson.JSONDecodeError:
                     pass
             results.append(item)
         return results
@@ -703,8 +703,8 @@ def create_pending_upload(upload_id: str, job_id: str, recipe_data: Dict,
     """Create a pending upload waiting for confirmation."""
     with get_db() as conn:
         cursor = conn.cursor()
-        recipe_json = json.dumps(recipe_data)
-        candidates_json = json.dumps(image_candidates) if image_candidates else None
+        recipe_json = orjson.dumps(recipe_data).decode()
+        candidates_json = orjson.dumps(image_candidates).decode() if image_candidates else None
         cursor.execute('''
             INSERT INTO pending_uploads
             (id, job_id, recipe_data, image_path, image_candidates, output_target,
@@ -728,13 +728,13 @@ def get_pending_upload(upload_id: str) -> Optional[Dict[str, Any]]:
             # Parse JSON fields
             if item.get('recipe_data'):
                 try:
-                    item['recipe_data'] = json.loads(item['recipe_data'])
-                except json.JSONDecodeError:
+                    item['recipe_data'] = orjson.loads(item['recipe_data'])
+                except orjson.JSONDecodeError:
                     pass
             if item.get('image_candidates'):
                 try:
-                    item['image_candidates'] = json.loads(item['image_candidates'])
-                except json.JSONDecodeError:
+                    item['image_candidates'] = orjson.loads(item['image_candidates'])
+                except orjson.JSONDecodeError:
                     item['image_candidates'] = []
             return item
     return None
@@ -758,13 +758,13 @@ def get_pending_uploads() -> List[Dict[str, Any]]:
             # Parse JSON fields
             if item.get('recipe_data'):
                 try:
-                    item['recipe_data'] = json.loads(item['recipe_data'])
-                except json.JSONDecodeError:
+                    item['recipe_data'] = orjson.loads(item['recipe_data'])
+                except orjson.JSONDecodeError:
                     pass
             if item.get('image_candidates'):
                 try:
-                    item['image_candidates'] = json.loads(item['image_candidates'])
-                except json.JSONDecodeError:
+                    item['image_candidates'] = orjson.loads(item['image_candidates'])
+                except orjson.JSONDecodeError:
                     item['image_candidates'] = []
             results.append(item)
         return results